@@ -5,9 +5,18 @@ Handles macOS visual notifications using various methods with fallbacks.
 
 import logging
 import os
-import subprocess
-import time
-from typing import Optional
+from typing import Any, Callable, Optional
+
+from notifications import __version__
+from notifications.platform import IS_MACOS, log_unsupported_platform
+from notifications.platform.macos.notification import (
+    SCRIPT_CACHE_DIR,
+    clear_native_backend_cache,
+    get_native_sender,
+    send_notification_applescript,
+    send_notification_terminal_notifier,
+)
+from notifications.utils.config import get_config, reload_config
 
 logger = logging.getLogger("claude-notifications")
 
@@ -15,6 +24,10 @@ class NotificationManager:
     """
     Manages macOS visual notifications using PyObjC, pync, AppleScript, or terminal-notifier.
     """
+
+    # Used as a namespace of classmethods; instances carry no state
+    __slots__ = ()
+
     # Environment variable names for enabling/disabling visual notifications
     ENV_VISUAL_NOTIFICATIONS = "CLAUDE_VISUAL_NOTIFICATIONS"
     ENV_NOTIFICATION_ICON = "CLAUDE_NOTIFICATION_ICON"
@@ -27,317 +40,203 @@ class NotificationManager:
     )
     APP_ICON_PATH = "/Applications/Claude.app/Contents/Resources/AppIcon.icns"
 
+    # Marks the icon lookup as not done yet (None is a valid result)
+    _UNRESOLVED = object()
+
+    # Resolved icon path (populated on first call)
+    _icon: Any = _UNRESOLVED
+
+    # Notification method that last succeeded (tried first on the next call)
+    _preferred_method: Optional[Callable[[str, str, Optional[str]], bool]] = None
+
+    # Set once a test notification has been delivered (registration is then done)
+    _test_notification_sent = False
+
+    # Written after the first delivered test notification, so later server starts of
+    # the same version skip it: the app is already registered with Notification Center
+    REGISTRATION_MARKER = os.path.join(SCRIPT_CACHE_DIR, f"registered-{__version__}")
+
     @classmethod
-    def are_visual_notifications_enabled(cls) -> bool:
+    def clear_cache(cls) -> None:
+        """Forget the cached settings so the environment is re-read."""
+        cls._icon = cls._UNRESOLVED
+        cls._test_notification_sent = False
+        cls._preferred_method = None
+        clear_native_backend_cache()
+        reload_config()
+
+    @staticmethod
+    def are_visual_notifications_enabled() -> bool:
         """Check if visual notifications are enabled."""
-        env_value = os.environ.get(cls.ENV_VISUAL_NOTIFICATIONS, "true").lower()
-        return env_value in ("true", "1", "yes", "y", "on")
+        return get_config().visual_enabled
 
     @classmethod
     def get_notification_icon(cls) -> Optional[str]:
-        """Get the path to the icon for notifications."""
+        """Get the path to the icon for notifications (resolved once, then cached)."""
+        if cls._icon is cls._UNRESOLVED:
+            cls._icon = cls._find_notification_icon()
+        return cls._icon
+
+    @classmethod
+    def _find_notification_icon(cls) -> Optional[str]:
+        """Look up the notification icon in priority order."""
         # Check environment variable first (highest priority)
-        custom_icon = os.environ.get(cls.ENV_NOTIFICATION_ICON)
+        custom_icon = get_config().icon_path
         if custom_icon and os.path.exists(custom_icon):
-            logger.info(f"Using custom notification icon: {custom_icon}")
+            logger.debug("Using custom notification icon: %s", custom_icon)
             return custom_icon
 
         # Use local project icon if available (second priority)
         if os.path.exists(cls.LOCAL_ICON_PATH):
-            logger.info(f"Using bundled Claude icon: {cls.LOCAL_ICON_PATH}")
+            logger.debug("Using bundled Claude icon: %s", cls.LOCAL_ICON_PATH)
             return cls.LOCAL_ICON_PATH
 
         # Use default Claude app icon if available (third priority)
         if os.path.exists(cls.APP_ICON_PATH):
-            logger.info(f"Using default Claude app icon: {cls.APP_ICON_PATH}")
+            logger.debug("Using default Claude app icon: %s", cls.APP_ICON_PATH)
             return cls.APP_ICON_PATH
 
         return None
 
-    @staticmethod
-    def send_notification_applescript(title: str, message: str) -> bool:
-        """
-        Send a notification using AppleScript as a fallback method.
-        Uses an enhanced script for better reliability in MCP context.
+    # The individual methods live in the platform module; these aliases keep the
+    # NotificationManager API unchanged
+    send_notification_applescript = staticmethod(send_notification_applescript)
+    send_notification_terminal_notifier = staticmethod(send_notification_terminal_notifier)
 
-        Args:
-            title: The notification title
-            message: The notification message
-
-        Returns:
-            True if notification was sent successfully, False otherwise
-        """
-        try:
-            # Create an enhanced AppleScript that works better in MCP context
-            script = f'''
-            tell application "System Events"
-                # Capture current frontmost app
-                set frontApp to name of first application process whose frontmost is true
-
-                # Ensure notification is shown no matter what application is focused
-                display notification "{message}" with title "{title}"
-
-                # Give the notification time to display
-                delay 1
-            end tell
-            '''
-
-            # Run the AppleScript with increased timeout
-            logger.info("Attempting to send notification using Enhanced AppleScript")
-            process = subprocess.run(
-                ["osascript", "-e", script],
-                check=True,
-                capture_output=True,
-                timeout=5  # Add timeout to prevent hanging
-            )
-
-            logger.info(f"Sent notification using Enhanced AppleScript: {title} - {message}")
-            logger.debug(
-                f"AppleScript stdout: {process.stdout.decode() if process.stdout else 'None'}"
-            )
-
-            # Add a small delay after sending to ensure notification displays before control returns
-            time.sleep(0.5)
+    @staticmethod
+    def _send_applescript(title: str, message: str, icon_path: Optional[str]) -> bool:
+        """AppleScript step of the fallback chain (it can't show a custom icon)."""
+        return NotificationManager.send_notification_applescript(title, message)
 
-            return True
-        except subprocess.CalledProcessError as e:
-            logger.error(f"Error running Enhanced AppleScript notification: {e}")
-            logger.error(f"stderr: {e.stderr.decode() if e.stderr else 'None'}")
-            return False
-        except subprocess.TimeoutExpired:
-            logger.error("AppleScript notification timed out")
-            return False
-        except Exception as e:
-            logger.error(f"Unexpected error with Enhanced AppleScript notification: {e}")
-            return False
+    @staticmethod
+    def _send_terminal_notifier(title: str, message: str, icon_path: Optional[str]) -> bool:
+        """terminal-notifier step of the fallback chain (it can show the icon)."""
+        # Don't specify sound to avoid duplicate sounds
+        return NotificationManager.send_notification_terminal_notifier(
+            title=title,
+            message=message,
+            sound=None,
+            icon_path=icon_path
+        )
 
     @staticmethod
-    def send_notification_terminal_notifier(
+    def _send_native(title: str, message: str, icon_path: Optional[str]) -> bool:
+        """Native step of the fallback chain (PyObjC, else pync, chosen once at first use)."""
+        return get_native_sender()(title, message, icon_path)
+
+    @classmethod
+    def _try_method(
+        cls,
+        method: Callable[[str, str, Optional[str]], bool],
         title: str,
         message: str,
-        sound: Optional[str] = None,
-        icon_path: Optional[str] = None
+        icon_path: Optional[str]
     ) -> bool:
-        """
-        Send a notification using terminal-notifier with enhanced reliability for MCP context.
-
-        Args:
-            title: The notification title
-            message: The notification message
-            sound: Optional sound name (default: None to avoid duplicate sounds)
-            icon_path: Optional path to icon file
-
-        Returns:
-            True if notification was sent successfully, False otherwise
-        """
+        """Run one notification method, treating an exception as a failure."""
         try:
-            # Check if terminal-notifier is installed
-            which_result = subprocess.run(
-                ["which", "terminal-notifier"],
-                capture_output=True,
-                text=True
-            )
-
-            if which_result.returncode != 0:
-                logger.warning(
-                    "terminal-notifier not found, install it with: brew install terminal-notifier"
-                )
-                return False
-
-            # Use provided icon or Claude icon or default system icon
-            icon = None
-            if icon_path and os.path.exists(icon_path):
-                icon = icon_path
-            else:
-                # Look for Claude icon
-                claude_icon = "/Applications/Claude.app/Contents/Resources/AppIcon.icns"
-                if os.path.exists(claude_icon):
-                    icon = claude_icon
-                else:
-                    # Use system alert icon as fallback
-                    system_icon = (
-                        "/System/Library/CoreServices/CoreTypes.bundle/Contents/Resources/AlertNoteIcon.icns"
-                    )
-                    if os.path.exists(system_icon):
-                        icon = system_icon
-
-            # Build command with additional options for MCP context reliability
-            cmd = [
-                "terminal-notifier",
-                "-title", title,
-                "-message", message,
-                "-activate", "com.anthropic.claude",  # Try to activate Claude when clicking
-                "-sender", "com.apple.Terminal"  # Use Terminal as the sender for better visibility
-            ]
-
-            # Add icon if available
-            if icon:
-                cmd.extend(["-contentImage", icon])
-                cmd.extend(["-appIcon", icon])
-
-            # Add sound if specified
-            if sound:
-                cmd.extend(["-sound", sound])
-
-            # Add additional options to improve visibility
-            cmd.extend(["-timeout", "10"])  # 10 second timeout
-
-            # Send notification with increased timeout
-            logger.info(
-                f"Attempting to send notification using enhanced terminal-notifier with cmd: {cmd}"
-            )
-            process = subprocess.run(cmd, check=True, capture_output=True, timeout=5)
-
-            logger.info(f"Sent notification using enhanced terminal-notifier: {title} - {message}")
-            logger.debug(
-                f"terminal-notifier stdout: {process.stdout.decode() if process.stdout else 'None'}"
-            )
-
-            # Add small delay after notification to ensure it's processed
-            time.sleep(0.5)
-            return True
-        except subprocess.CalledProcessError as e:
-            logger.error(f"Error with enhanced terminal-notifier: {e}")
-            logger.error(f"stderr: {e.stderr.decode() if e.stderr else 'None'}")
-            return False
-        except subprocess.TimeoutExpired:
-            logger.error("terminal-notifier command timed out")
-            return False
+            success = method(title, message, icon_path)
+            logger.debug("%s notification attempted: %s", method.__name__, success)
+            return success
         except Exception as e:
-            logger.error(f"Unexpected error with enhanced terminal-notifier: {e}")
+            logger.warning(f"Error in {method.__name__} notification attempt: {e}")
             return False
 
-    @staticmethod
-    def send_notification(title: str, message: str, icon_path: Optional[str] = None) -> bool:
+    @classmethod
+    def send_notification(
+        cls,
+        title: str,
+        message: str,
+        icon_path: Optional[str] = None,
+        prefer_icon: bool = False
+    ) -> bool:
         """
         Send a macOS notification using multiple methods with fallbacks.
 
+        For MCP server context AppleScript and terminal-notifier are tried first as they
+        are more reliable, then the native backend. The method that last succeeded is
+        remembered and tried first next time; the full chain only runs if it fails.
+        Each method is tried at most once. Off macOS no method is attempted.
+
         Args:
             title: The notification title
             message: The notification message
             icon_path: Path to the icon file (optional)
+            prefer_icon: Try terminal-notifier, which can show the icon, before any
+                other method
 
         Returns:
             True if notification was sent successfully with any method, False otherwise
         """
-        logger.info(f"Attempting to send notification: {title} - {message}")
+        if not IS_MACOS:
+            log_unsupported_platform()
+            return False
 
-        # Try multiple notification methods in sequence
-        methods_tried = 0
-        success = False
+        logger.debug("Attempting to send notification: %s - %s", title, message)
 
-        # For MCP server context, first try AppleScript and terminal-notifier as they are
-        # more reliable
-        # 1. First try AppleScript as it's the most reliable in MCP context
-        try:
-            success = NotificationManager.send_notification_applescript(title, message)
-            methods_tried += 1
-            logger.info(f"AppleScript notification attempted: {success}")
-        except Exception as e:
-            logger.warning(f"Error in AppleScript notification attempt: {e}")
-
-        # 2. Try terminal-notifier next
-        if not success:
-            try:
-                success = NotificationManager.send_notification_terminal_notifier(
-                    title=title,
-                    message=message,
-                    sound=None  # Don't specify sound to avoid duplicate sounds
-                )
-                methods_tried += 1
-                logger.info(f"Terminal-notifier notification attempted: {success}")
-            except Exception as e:
-                logger.warning(f"Error in terminal-notifier attempt: {e}")
-
-        # 3. Then try with PyObjC
-        if not success:
-            try:
-                try:
-                    from Foundation import NSImage, NSUserNotification, NSUserNotificationCenter
-
-                    notification = NSUserNotification.alloc().init()
-                    notification.setTitle_(title)
-                    notification.setInformativeText_(message)
-
-                    # Set the icon if provided
-                    if icon_path:
-                        image = NSImage.alloc().initWithContentsOfFile_(icon_path)
-                        if image:
-                            notification.setContentImage_(image)
-
-                    center = NSUserNotificationCenter.defaultUserNotificationCenter()
-                    center.deliverNotification_(notification)
-                    logger.info("Sent notification using PyObjC")
-                    success = True
-                except ImportError:
-                    logger.info("PyObjC not available, will try other methods")
-                except Exception as e:
-                    logger.warning(f"PyObjC notification failed: {e}")
-
-                methods_tried += 1
-            except Exception as e:
-                logger.warning(f"Error in PyObjC notification attempt: {e}")
-
-        # 4. Try with pync as last resort
-        if not success:
-            try:
-                try:
-                    import pync
-                    if icon_path:
-                        pync.notify(message, title=title, contentImage=icon_path, appIcon=icon_path)
-                    else:
-                        pync.notify(message, title=title)
-                    logger.info("Sent notification using pync")
-                    success = True
-                except ImportError:
-                    logger.info("pync not available, will try other methods")
-                except Exception as e:
-                    logger.warning(f"pync notification failed: {e}")
-
-                methods_tried += 1
-            except Exception as e:
-                logger.warning(f"Error in pync notification attempt: {e}")
-
-        logger.info(f"Notification result: success={success}, methods_tried={methods_tried}")
-        return success
+        chain = [cls._send_applescript, cls._send_terminal_notifier, cls._send_native]
+        preferred = cls._preferred_method
+        if preferred is not None:
+            chain.remove(preferred)
+            chain.insert(0, preferred)
+        if prefer_icon:
+            chain.remove(cls._send_terminal_notifier)
+            chain.insert(0, cls._send_terminal_notifier)
+
+        for method in chain:
+            if cls._try_method(method, title, message, icon_path):
+                cls._preferred_method = method
+                return True
+
+        cls._preferred_method = None
+        logger.debug("All notification methods failed")
+        return False
 
     @classmethod
     def send_test_notification(cls) -> bool:
         """
         Send a test notification to ensure the application is registered with Notification Center.
-        This will trigger the permission prompt if needed.
+        This will trigger the permission prompt if needed. After the first successful
+        delivery later calls return True without sending anything. Later server
+        processes skip it too (tracked by REGISTRATION_MARKER), but only when AppleScript
+        or terminal-notifier delivered it: the native sender reports success even when
+        Notification Center shows nothing.
 
         Returns:
             True if notification was sent successfully, False otherwise
         """
+        if cls._test_notification_sent:
+            return True
+
+        if os.path.exists(cls.REGISTRATION_MARKER):
+            logger.debug("Already registered with Notification Center, skipping test")
+            cls._test_notification_sent = True
+            return True
+
         try:
             title = "Claude Notification Server"
             message = "Initializing notification permissions"
 
-            # Try multiple methods for the test notification
+            # send_notification already tries AppleScript first (which is what requests
+            # permission) and PyObjC later, so there is nothing left to retry on failure
             success = cls.send_notification(title, message)
 
-            # If all methods failed, try the direct method as a last resort
-            if not success:
-                try:
-                    from Foundation import NSUserNotification, NSUserNotificationCenter
-                    notification = NSUserNotification.alloc().init()
-                    notification.setTitle_(title)
-                    notification.setInformativeText_(message)
-                    center = NSUserNotificationCenter.defaultUserNotificationCenter()
-                    center.deliverNotification_(notification)
-                    logger.info("Sent test notification using direct PyObjC method")
-                    success = True
-                except Exception as e:
-                    logger.warning(f"Direct PyObjC test notification failed: {e}")
-
-            # Always try AppleScript as well to make sure permissions are requested
-            try:
-                cls.send_notification_applescript(title, message)
-            except Exception as e:
-                logger.warning(f"AppleScript test notification failed: {e}")
-
+            # Once delivered through a command-line tool, the app is registered for good
+            cls._test_notification_sent = success
+            if success and cls._preferred_method in (
+                cls._send_applescript, cls._send_terminal_notifier
+            ):
+                cls._write_registration_marker()
             return success
         except Exception as e:
             logger.error(f"Error sending test notification: {e}")
             return False
+
+    @classmethod
+    def _write_registration_marker(cls) -> None:
+        """Record that this install has been registered with Notification Center."""
+        try:
+            os.makedirs(os.path.dirname(cls.REGISTRATION_MARKER), exist_ok=True)
+            with open(cls.REGISTRATION_MARKER, "w"):
+                pass
+        except OSError as e:
+            logger.debug("Could not write registration marker: %s", e)
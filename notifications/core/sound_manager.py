@@ -5,7 +5,25 @@ Handles sound playback for notifications using macOS system sounds.
 
 import logging
 import os
-import subprocess
+from typing import Dict, Tuple
+
+from notifications.platform import IS_MACOS, log_unsupported_platform
+from notifications.platform.macos.coreaudio import load_sound_audiotoolbox, play_sound_audiotoolbox
+from notifications.platform.macos.sound import (
+    load_sound_nssound,
+    play_sound_afplay,
+    play_sound_nssound,
+)
+from notifications.utils.config import (
+    DEFAULT_COMPLETE_PATH,
+    DEFAULT_COMPLETE_SOUND,
+    DEFAULT_START_PATH,
+    DEFAULT_START_SOUND,
+    ENV_SOUND_NOTIFICATIONS,
+    SYSTEM_SOUNDS_DIR,
+    get_config,
+    reload_config,
+)
 
 logger = logging.getLogger("claude-notifications")
 
@@ -14,72 +32,118 @@ class SoundManager:
     Manages sound playback for notifications using macOS system sounds.
     """
 
+    # Used as a namespace of classmethods; instances carry no state
+    __slots__ = ()
+
     # Default system sounds directory on macOS
-    SYSTEM_SOUNDS_DIR = "/System/Library/Sounds/"
+    SYSTEM_SOUNDS_DIR = SYSTEM_SOUNDS_DIR
 
     # Default sounds (will be used if no custom sounds are specified)
-    DEFAULT_START_SOUND = "Glass.aiff"
-    DEFAULT_COMPLETE_SOUND = "Hero.aiff"
+    DEFAULT_START_SOUND = DEFAULT_START_SOUND
+    DEFAULT_COMPLETE_SOUND = DEFAULT_COMPLETE_SOUND
+
+    # Full default sound paths
+    DEFAULT_START_PATH = DEFAULT_START_PATH
+    DEFAULT_COMPLETE_PATH = DEFAULT_COMPLETE_PATH
 
     # Environment variable names for custom sounds
     ENV_START_SOUND = "CLAUDE_START_SOUND"
     ENV_COMPLETE_SOUND = "CLAUDE_COMPLETE_SOUND"
 
+    # (EnvConfig attribute, default path, label) keyed by is_start
+    _SOUND_TABLE = {
+        True: ("start_sound", DEFAULT_START_PATH, "start"),
+        False: ("complete_sound", DEFAULT_COMPLETE_PATH, "completion"),
+    }
+
+    # Environment variable for enabling/disabling notification sounds
+    ENV_SOUND_NOTIFICATIONS = ENV_SOUND_NOTIFICATIONS
+
+    # Resolved (path, exists) pairs keyed by notification type (populated on first lookup)
+    _resolved: Dict[bool, Tuple[str, bool]] = {}
+
+    @classmethod
+    def clear_cache(cls) -> None:
+        """Forget resolved sound paths so the environment is re-read."""
+        cls._resolved.clear()
+        reload_config()
+
+    @staticmethod
+    def are_sound_notifications_enabled() -> bool:
+        """Check if notification sounds are enabled."""
+        return get_config().sound_enabled
+
     @classmethod
     def get_notification_sound(cls, is_start: bool = True) -> str:
         """Get the path to the sound file for notifications.
 
+        The environment and filesystem are only consulted on the first call for each
+        notification type; later calls return the cached path.
+
         Args:
             is_start: True for start sound, False for completion sound
         """
-        # Get the appropriate environment variable and default sound based on notification type
-        if is_start:
-            env_var = cls.ENV_START_SOUND
-            default_sound = cls.DEFAULT_START_SOUND
-            sound_type = "start"
-        else:
-            env_var = cls.ENV_COMPLETE_SOUND
-            default_sound = cls.DEFAULT_COMPLETE_SOUND
-            sound_type = "completion"
+        return cls.get_notification_sound_verified(is_start)[0]
+
+    @classmethod
+    def get_notification_sound_verified(cls, is_start: bool = True) -> Tuple[str, bool]:
+        """Get the sound file path for notifications along with whether it exists.
+
+        Each path is stat'd at most once; the result is cached with the path.
+
+        Args:
+            is_start: True for start sound, False for completion sound
+
+        Returns:
+            (path, exists) for the resolved sound file
+        """
+        cached = cls._resolved.get(is_start)
+        if cached is not None:
+            return cached
+
+        attribute, sound_file, sound_type = cls._SOUND_TABLE[is_start]
 
         # Check for custom sound
-        custom_sound = os.environ.get(env_var)
+        custom_sound = getattr(get_config(), attribute)
         if custom_sound and os.path.exists(custom_sound):
-            logger.info(f"Using custom {sound_type} sound: {custom_sound}")
-            return custom_sound
+            logger.debug("Using custom %s sound: %s", sound_type, custom_sound)
+            resolved = (custom_sound, True)
+        else:
+            # Use default sound
+            logger.debug("Using default %s sound: %s", sound_type, sound_file)
+            resolved = (sound_file, os.path.exists(sound_file))
 
-        # Use default sound
-        sound_file = os.path.join(cls.SYSTEM_SOUNDS_DIR, default_sound)
-        logger.info(f"Using default {sound_type} sound: {sound_file}")
-        return sound_file
+        cls._resolved[is_start] = resolved
+        return resolved
 
     @staticmethod
-    def play_sound(sound_file: str) -> bool:
+    def preload_sound(sound_file: str) -> bool:
         """
-        Play a sound file using macOS afplay command.
+        Load a sound file into an in-process backend ahead of time, so the first
+        notification plays without cold-start latency.
 
-        Returns True if sound played successfully, False otherwise.
+        Returns True if an in-process backend has the sound ready, False otherwise
+        (playback then falls back to afplay).
         """
-        if not os.path.exists(sound_file):
-            logger.error(f"Sound file does not exist: {sound_file}")
-            return False
+        return load_sound_audiotoolbox(sound_file) or load_sound_nssound(sound_file)
 
-        try:
-            logger.info(f"Playing sound: {sound_file}")
-            subprocess.run(
-                ["afplay", sound_file],
-                check=True,
-                capture_output=True
-            )
-            logger.info("Sound played successfully")
-            return True
-        except subprocess.CalledProcessError as e:
-            logger.error(f"Error playing sound: {e}")
-            logger.error(f"stderr: {e.stderr.decode() if e.stderr else 'None'}")
-            return False
-        except FileNotFoundError:
-            logger.error("afplay command not found. Are you running on macOS?")
-            return False
-        except Exception as e:
-            logger.error(f"Unexpected error playing sound: {e}")
+    @classmethod
+    def play_sound(cls, sound_file: str) -> bool:
+        """
+        Play a sound file without waiting for it to finish.
+
+        Tries in-process playback first (AudioToolbox, then NSSound when PyObjC is
+        available) and falls back to the macOS afplay command otherwise.
+
+        Returns True if playback was started, False otherwise. Off
+        macOS nothing is attempted and False is returned.
+        """
+        if not IS_MACOS:
+            log_unsupported_platform()
             return False
+
+        return (
+            play_sound_audiotoolbox(sound_file)
+            or play_sound_nssound(sound_file)
+            or play_sound_afplay(sound_file)
+        )
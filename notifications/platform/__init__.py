@@ -1,3 +1,17 @@
 """
 Platform-specific implementations for Claude Notifications MCP Server.
 """
+
+import functools
+import logging
+import sys
+
+logger = logging.getLogger("claude-notifications")
+
+# Every backend is macOS-only; elsewhere the managers skip them entirely
+IS_MACOS = sys.platform == "darwin"
+
+@functools.lru_cache(maxsize=None)
+def log_unsupported_platform() -> None:
+    """Note (once per process) that notifications are skipped on this platform."""
+    logger.info("Notifications require macOS; skipping on platform %r", sys.platform)
@@ -0,0 +1,152 @@
+"""
+macOS AudioToolbox bindings for Claude Notifications MCP Server.
+Plays sounds through System Sound Services via ctypes, without spawning a process.
+"""
+
+import ctypes
+import functools
+import logging
+import os
+from typing import Any, Dict, Optional, Tuple
+
+logger = logging.getLogger("claude-notifications")
+
+AUDIO_TOOLBOX_PATH = "/System/Library/Frameworks/AudioToolbox.framework/AudioToolbox"
+CORE_FOUNDATION_PATH = "/System/Library/Frameworks/CoreFoundation.framework/CoreFoundation"
+
+# AudioServicesPropertyID 'isui'. New SystemSoundIDs default to 1, which plays at the
+# alert volume and is muted when "Play user interface sound effects" is turned off
+K_AUDIO_SERVICES_PROPERTY_IS_UI_SOUND = 0x69737569
+
+# SystemSoundIDs keyed by file path, registered on first playback
+_sound_ids: Dict[str, int] = {}
+
+@functools.lru_cache(maxsize=None)
+def _load_frameworks() -> Optional[Tuple[Any, Any]]:
+    """
+    Load AudioToolbox and CoreFoundation once and declare the functions we call.
+
+    Returns:
+        (audio_toolbox, core_foundation) library handles, or None if unavailable
+    """
+    try:
+        audio_toolbox = ctypes.CDLL(AUDIO_TOOLBOX_PATH)
+        core_foundation = ctypes.CDLL(CORE_FOUNDATION_PATH)
+    except OSError:
+        logger.info("AudioToolbox not available, will try other sound methods")
+        return None
+
+    core_foundation.CFURLCreateFromFileSystemRepresentation.restype = ctypes.c_void_p
+    core_foundation.CFURLCreateFromFileSystemRepresentation.argtypes = [
+        ctypes.c_void_p, ctypes.c_char_p, ctypes.c_long, ctypes.c_bool
+    ]
+    core_foundation.CFRelease.restype = None
+    core_foundation.CFRelease.argtypes = [ctypes.c_void_p]
+
+    audio_toolbox.AudioServicesCreateSystemSoundID.restype = ctypes.c_int32
+    audio_toolbox.AudioServicesCreateSystemSoundID.argtypes = [
+        ctypes.c_void_p, ctypes.POINTER(ctypes.c_uint32)
+    ]
+    audio_toolbox.AudioServicesSetProperty.restype = ctypes.c_int32
+    audio_toolbox.AudioServicesSetProperty.argtypes = [
+        ctypes.c_uint32, ctypes.c_uint32, ctypes.c_void_p, ctypes.c_uint32, ctypes.c_void_p
+    ]
+    audio_toolbox.AudioServicesPlaySystemSound.restype = None
+    audio_toolbox.AudioServicesPlaySystemSound.argtypes = [ctypes.c_uint32]
+    audio_toolbox.AudioServicesDisposeSystemSoundID.restype = ctypes.c_int32
+    audio_toolbox.AudioServicesDisposeSystemSoundID.argtypes = [ctypes.c_uint32]
+
+    return audio_toolbox, core_foundation
+
+def _create_sound_id(audio_toolbox: Any, core_foundation: Any, sound_file: str) -> Optional[int]:
+    """
+    Register a sound file with System Sound Services.
+
+    Returns:
+        The SystemSoundID for the file, or None if it could not be registered
+    """
+    path = os.fsencode(sound_file)
+    url = core_foundation.CFURLCreateFromFileSystemRepresentation(None, path, len(path), False)
+    if not url:
+        logger.warning(f"Could not create URL for sound file: {sound_file}")
+        return None
+
+    sound_id = ctypes.c_uint32()
+    try:
+        status = audio_toolbox.AudioServicesCreateSystemSoundID(url, ctypes.byref(sound_id))
+    finally:
+        core_foundation.CFRelease(url)
+
+    if status != 0:
+        logger.warning(f"AudioServicesCreateSystemSoundID failed ({status}) for: {sound_file}")
+        return None
+
+    # Play as a regular sound (output volume, not subject to the UI sound effects
+    # setting). If this fails the sound could be silently muted, so don't use the ID:
+    # playback then falls back to NSSound or afplay.
+    is_ui_sound = ctypes.c_uint32(0)
+    status = audio_toolbox.AudioServicesSetProperty(
+        K_AUDIO_SERVICES_PROPERTY_IS_UI_SOUND,
+        ctypes.sizeof(sound_id), ctypes.byref(sound_id),
+        ctypes.sizeof(is_ui_sound), ctypes.byref(is_ui_sound)
+    )
+    if status != 0:
+        logger.warning(f"AudioServicesSetProperty failed ({status}) for: {sound_file}")
+        audio_toolbox.AudioServicesDisposeSystemSoundID(sound_id)
+        return None
+    return sound_id.value
+
+def _get_sound_id(sound_file: str) -> Optional[int]:
+    """Get the cached SystemSoundID for a file, registering it on first use."""
+    frameworks = _load_frameworks()
+    if frameworks is None:
+        return None
+
+    sound_id = _sound_ids.get(sound_file)
+    if sound_id is None:
+        sound_id = _create_sound_id(*frameworks, sound_file)
+        if sound_id is not None:
+            _sound_ids[sound_file] = sound_id
+    return sound_id
+
+def load_sound_audiotoolbox(sound_file: str) -> bool:
+    """
+    Register a sound file with System Sound Services without playing it, so the
+    first notification doesn't pay for loading the file.
+
+    Args:
+        sound_file: Path to the sound file to load
+
+    Returns:
+        True if the sound is ready to play, False otherwise
+    """
+    try:
+        return _get_sound_id(sound_file) is not None
+    except Exception as e:
+        logger.warning(f"AudioToolbox could not load sound: {e}")
+        return False
+
+def play_sound_audiotoolbox(sound_file: str) -> bool:
+    """
+    Play a sound file using AudioServicesPlaySystemSound.
+
+    The SystemSoundID is cached per file, so after the first call playback is a single
+    call into AudioToolbox; the sound itself plays on CoreAudio's own thread.
+
+    Args:
+        sound_file: Path to the sound file to play
+
+    Returns:
+        True if playback was started successfully, False otherwise
+    """
+    try:
+        sound_id = _get_sound_id(sound_file)
+        if sound_id is None:
+            return False
+
+        logger.debug("Playing sound with AudioToolbox: %s", sound_file)
+        _load_frameworks()[0].AudioServicesPlaySystemSound(sound_id)
+        return True
+    except Exception as e:
+        logger.warning(f"AudioToolbox playback failed: {e}")
+        return False
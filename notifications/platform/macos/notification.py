@@ -2,14 +2,113 @@
 macOS-specific notification methods for Claude Notifications MCP Server.
 """
 
+import functools
 import logging
 import os
+import shutil
 import subprocess
-import time
-from typing import Optional
+import tempfile
+import threading
+import zlib
+from typing import Any, Callable, Dict, Optional, Tuple
 
 logger = logging.getLogger("claude-notifications")
 
+# Absolute paths to the notification tools, or None when they aren't installed. Spawning
+# by absolute path (with close_fds=False) lets subprocess use posix_spawn() rather than
+# fork()+exec(); Python's own descriptors are non-inheritable, so none leak to the child.
+OSASCRIPT_PATH = shutil.which("osascript")
+TERMINAL_NOTIFIER_PATH = shutil.which("terminal-notifier")
+
+# Icons used by terminal-notifier when no icon is given, in order of preference
+CLAUDE_APP_ICON_PATH = "/Applications/Claude.app/Contents/Resources/AppIcon.icns"
+SYSTEM_ALERT_ICON_PATH = (
+    "/System/Library/CoreServices/CoreTypes.bundle/Contents/Resources/AlertNoteIcon.icns"
+)
+
+# Decoded NSImage icons keyed by file path, loaded on first use
+_icon_images: Dict[str, Any] = {}
+
+# NSUserNotifications with title and icon already set, keyed by (title, icon_path)
+_notification_templates: Dict[Tuple[str, Optional[str]], Any] = {}
+
+@functools.lru_cache(maxsize=None)
+def _icon_exists(icon_path: str) -> bool:
+    """Check whether an icon file exists, stat'ing each path only once."""
+    return os.path.exists(icon_path)
+
+@functools.lru_cache(maxsize=None)
+def _default_icon() -> Optional[str]:
+    """Get the first available fallback icon (resolved once)."""
+    for icon_path in (CLAUDE_APP_ICON_PATH, SYSTEM_ALERT_ICON_PATH):
+        if _icon_exists(icon_path):
+            return icon_path
+    return None
+
+def _decode_stderr(stderr: Optional[bytes]) -> Optional[str]:
+    """Decode captured stderr for logging (only called when a command has failed)."""
+    return stderr.decode(errors="replace").strip() if stderr else None
+
+# Posts a notification with the title and message given as arguments. The notification
+# is displayed directly: a System Events tell block only adds Apple Events round trips.
+NOTIFY_SCRIPT_SOURCE = (
+    "on run argv",
+    "display notification (item 2 of argv) with title (item 1 of argv)",
+    "end run",
+)
+
+# Per-user cache directory (not /tmp, where another user could plant files)
+SCRIPT_CACHE_DIR = os.path.expanduser("~/Library/Caches/claude-notifications")
+
+# Serialises compiling the notification script (lru_cache doesn't lock the first call)
+_compile_lock = threading.Lock()
+
+@functools.lru_cache(maxsize=None)
+def _notify_script_args() -> Tuple[str, ...]:
+    """
+    Get the osascript arguments that run NOTIFY_SCRIPT_SOURCE.
+
+    The script is compiled with osacompile once and the .scpt is reused, so osascript
+    doesn't parse the source on every notification. It is compiled into a temporary
+    file that only replaces the .scpt once osacompile succeeds, so an interrupted
+    compile never leaves a broken script behind. If compiling fails the source is
+    passed with -e instead.
+    """
+    source_args = tuple(arg for line in NOTIFY_SCRIPT_SOURCE for arg in ("-e", line))
+
+    # The file name carries a checksum of the source so an edited script is recompiled
+    checksum = zlib.crc32("\n".join(NOTIFY_SCRIPT_SOURCE).encode())
+    compiled = os.path.join(SCRIPT_CACHE_DIR, f"notify-{checksum:08x}.scpt")
+    with _compile_lock:
+        if os.path.exists(compiled):
+            return (compiled,)
+        if shutil.which("osacompile") is None:
+            return source_args
+
+        temp_path = None
+        try:
+            os.makedirs(SCRIPT_CACHE_DIR, exist_ok=True)
+            fd, temp_path = tempfile.mkstemp(suffix=".scpt", dir=SCRIPT_CACHE_DIR)
+            os.close(fd)
+            subprocess.run(
+                ["osacompile", "-o", temp_path, *source_args],
+                check=True,
+                stdin=subprocess.DEVNULL,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+                timeout=5
+            )
+            os.replace(temp_path, compiled)
+        except (OSError, subprocess.SubprocessError) as e:
+            logger.debug("Could not precompile the notification AppleScript: %s", e)
+            if temp_path is not None:
+                try:
+                    os.unlink(temp_path)
+                except OSError:
+                    pass
+            return source_args
+    return (compiled,)
+
 def send_notification_applescript(title: str, message: str) -> bool:
     """
     Send a notification using AppleScript.
@@ -22,38 +121,29 @@ def send_notification_applescript(title: str, message: str) -> bool:
         True if notification was sent successfully, False otherwise
     """
     try:
-        # Create an enhanced AppleScript that works better in MCP context
-        script = f'''
-        tell application "System Events"
-            # Capture current frontmost app
-            set frontApp to name of first application process whose frontmost is true
-
-            # Ensure notification is shown no matter what application is focused
-            display notification "{message}" with title "{title}"
-
-            # Give the notification time to display
-            delay 1
-        end tell
-        '''
-
-        # Run the AppleScript with increased timeout
-        logger.info("Attempting to send notification using AppleScript")
+        # osascript is located once at import
+        if OSASCRIPT_PATH is None:
+            logger.debug("osascript not found, skipping AppleScript notification")
+            return False
+
+        # Title and message are passed as script arguments, never spliced into source
+        logger.debug("Attempting to send notification using AppleScript")
         subprocess.run(
-            ["osascript", "-e", script],
+            [OSASCRIPT_PATH, *_notify_script_args(), title, message],
             check=True,
-            capture_output=True,
+            # Only stderr is read (when reporting a failure)
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.PIPE,
+            close_fds=False,
             timeout=5  # Add timeout to prevent hanging
         )
 
-        logger.info(f"Sent notification using AppleScript: {title} - {message}")
-
-        # Add a small delay after sending to ensure notification displays before control returns
-        time.sleep(0.5)
-
+        logger.debug("Sent notification using AppleScript: %s - %s", title, message)
         return True
     except subprocess.CalledProcessError as e:
-        logger.error(f"Error running AppleScript notification: {e}")
-        logger.error(f"stderr: {e.stderr.decode() if e.stderr else 'None'}")
+        logger.error("Error running AppleScript notification: %s", e)
+        logger.error("stderr: %s", _decode_stderr(e.stderr))
         return False
     except subprocess.TimeoutExpired:
         logger.error("AppleScript notification timed out")
@@ -78,39 +168,19 @@ def send_notification_terminal_notifier(title: str, message: str,
         True if notification was sent successfully, False otherwise
     """
     try:
-        # Check if terminal-notifier is installed
-        which_result = subprocess.run(
-            ["which", "terminal-notifier"],
-            capture_output=True,
-            text=True
-        )
-
-        if which_result.returncode != 0:
-            logger.warning(
+        # terminal-notifier is located once at import
+        if TERMINAL_NOTIFIER_PATH is None:
+            logger.debug(
                 "terminal-notifier not found, install it with: brew install terminal-notifier"
             )
             return False
 
-        # Use provided icon or Claude icon or default system icon
-        icon = None
-        if icon_path and os.path.exists(icon_path):
-            icon = icon_path
-        else:
-            # Look for Claude icon
-            claude_icon = "/Applications/Claude.app/Contents/Resources/AppIcon.icns"
-            if os.path.exists(claude_icon):
-                icon = claude_icon
-            else:
-                # Use system alert icon as fallback
-                system_icon = (
-                    "/System/Library/CoreServices/CoreTypes.bundle/Contents/Resources/AlertNoteIcon.icns"
-                )
-                if os.path.exists(system_icon):
-                    icon = system_icon
+        # Use provided icon, else the Claude icon or the system alert icon
+        icon = icon_path if icon_path and _icon_exists(icon_path) else _default_icon()
 
         # Build command with additional options for MCP context reliability
         cmd = [
-            "terminal-notifier",
+            TERMINAL_NOTIFIER_PATH,
             "-title", title,
             "-message", message,
             "-activate", "com.anthropic.claude",  # Try to activate Claude when clicking
@@ -126,21 +196,27 @@ def send_notification_terminal_notifier(title: str, message: str,
         if sound:
             cmd.extend(["-sound", sound])
 
-        # Add additional options to improve visibility
-        cmd.extend(["-timeout", "10"])  # 10 second timeout
+        # No -timeout: it makes terminal-notifier stay in the foreground until the
+        # notification closes, which runs into the 5 second limit below
 
         # Send notification with increased timeout
-        logger.info("Attempting to send notification using terminal-notifier")
-        subprocess.run(cmd, check=True, capture_output=True, timeout=5)
-
-        logger.info(f"Sent notification using terminal-notifier: {title} - {message}")
+        logger.debug("Attempting to send notification using terminal-notifier")
+        subprocess.run(
+            cmd,
+            check=True,
+            # Only stderr is read (when reporting a failure)
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.PIPE,
+            close_fds=False,
+            timeout=5
+        )
 
-        # Add small delay after notification to ensure it's processed
-        time.sleep(0.5)
+        logger.debug("Sent notification using terminal-notifier: %s - %s", title, message)
         return True
     except subprocess.CalledProcessError as e:
-        logger.error(f"Error with terminal-notifier: {e}")
-        logger.error(f"stderr: {e.stderr.decode() if e.stderr else 'None'}")
+        logger.error("Error with terminal-notifier: %s", e)
+        logger.error("stderr: %s", _decode_stderr(e.stderr))
         return False
     except subprocess.TimeoutExpired:
         logger.error("terminal-notifier command timed out")
@@ -149,6 +225,80 @@ def send_notification_terminal_notifier(title: str, message: str,
         logger.error(f"Unexpected error with terminal-notifier: {e}")
         return False
 
+@functools.lru_cache(maxsize=None)
+def _foundation_classes() -> Optional[Tuple[Any, Any, Any]]:
+    """
+    Import the PyObjC notification classes once.
+
+    Returns:
+        (NSUserNotification, NSUserNotificationCenter, NSImage), or None if PyObjC
+        is unavailable
+    """
+    try:
+        from Foundation import NSImage, NSUserNotification, NSUserNotificationCenter
+        return NSUserNotification, NSUserNotificationCenter, NSImage
+    except ImportError:
+        logger.info("PyObjC not available")
+        return None
+
+@functools.lru_cache(maxsize=None)
+def _notification_center() -> Any:
+    """Get the default NSUserNotificationCenter once (requires PyObjC)."""
+    return _foundation_classes()[1].defaultUserNotificationCenter()
+
+@functools.lru_cache(maxsize=None)
+def _pync_module() -> Optional[Any]:
+    """Import pync once; returns None when it is unavailable."""
+    try:
+        import pync
+        return pync
+    except ImportError:
+        logger.info("pync not available")
+        return None
+
+def get_notification_backend() -> Optional[str]:
+    """
+    Get the native notification backend that is available.
+
+    Returns:
+        "pyobjc" or "pync", or None if neither can be imported
+    """
+    if _foundation_classes() is not None:
+        return "pyobjc"
+    if _pync_module() is not None:
+        return "pync"
+    return None
+
+def _load_icon_image(NSImage: Any, icon_path: str) -> Optional[Any]:
+    """Get the decoded NSImage for an icon file, loading it on first use."""
+    image = _icon_images.get(icon_path)
+    if image is None and _icon_exists(icon_path):
+        image = NSImage.alloc().initWithContentsOfFile_(icon_path)
+        if image:
+            _icon_images[icon_path] = image
+    return image
+
+def preload_notification_icon(icon_path: str) -> bool:
+    """
+    Decode an icon file ahead of time so the first PyObjC notification doesn't pay
+    for reading it.
+
+    Args:
+        icon_path: Path to the icon file
+
+    Returns:
+        True if the icon is decoded and cached, False otherwise
+    """
+    classes = _foundation_classes()
+    if classes is None:
+        return False
+
+    try:
+        return _load_icon_image(classes[2], icon_path) is not None
+    except Exception as e:
+        logger.warning(f"Could not load notification icon: {e}")
+        return False
+
 def send_notification_pyobjc(title: str, message: str, icon_path: Optional[str] = None) -> bool:
     """
     Send a notification using PyObjC (native macOS API).
@@ -161,26 +311,31 @@ def send_notification_pyobjc(title: str, message: str, icon_path: Optional[str]
     Returns:
         True if notification was sent successfully, False otherwise
     """
+    classes = _foundation_classes()
+    if classes is None:
+        return False
+    NSUserNotification, _, NSImage = classes
+
     try:
-        from Foundation import NSImage, NSUserNotification, NSUserNotificationCenter
+        # Copy the prebuilt title/icon template; only the message differs per call
+        template = _notification_templates.get((title, icon_path))
+        if template is None:
+            template = NSUserNotification.alloc().init()
+            template.setTitle_(title)
+
+            # Set the icon if provided (decoded once per path and reused)
+            image = _load_icon_image(NSImage, icon_path) if icon_path else None
+            if image:
+                template.setContentImage_(image)
 
-        notification = NSUserNotification.alloc().init()
-        notification.setTitle_(title)
-        notification.setInformativeText_(message)
+            _notification_templates[(title, icon_path)] = template
 
-        # Set the icon if provided
-        if icon_path and os.path.exists(icon_path):
-            image = NSImage.alloc().initWithContentsOfFile_(icon_path)
-            if image:
-                notification.setContentImage_(image)
+        notification = template.copy()
+        notification.setInformativeText_(message)
 
-        center = NSUserNotificationCenter.defaultUserNotificationCenter()
-        center.deliverNotification_(notification)
-        logger.info("Sent notification using PyObjC")
+        _notification_center().deliverNotification_(notification)
+        logger.debug("Sent notification using PyObjC")
         return True
-    except ImportError:
-        logger.info("PyObjC not available")
-        return False
     except Exception as e:
         logger.warning(f"PyObjC notification failed: {e}")
         return False
@@ -197,17 +352,49 @@ def send_notification_pync(title: str, message: str, icon_path: Optional[str] =
     Returns:
         True if notification was sent successfully, False otherwise
     """
+    pync = _pync_module()
+    if pync is None:
+        return False
+
     try:
-        import pync
-        if icon_path and os.path.exists(icon_path):
+        if icon_path and _icon_exists(icon_path):
             pync.notify(message, title=title, contentImage=icon_path, appIcon=icon_path)
         else:
             pync.notify(message, title=title)
-        logger.info("Sent notification using pync")
+        logger.debug("Sent notification using pync")
         return True
-    except ImportError:
-        logger.info("pync not available")
-        return False
     except Exception as e:
         logger.warning(f"pync notification failed: {e}")
         return False
+
+def _send_notification_unavailable(
+    title: str,
+    message: str,
+    icon_path: Optional[str] = None
+) -> bool:
+    """Native sender used when neither PyObjC nor pync is installed."""
+    return False
+
+# Native sender for each value of get_notification_backend()
+_NATIVE_SENDERS: Dict[Optional[str], Callable[[str, str, Optional[str]], bool]] = {
+    "pyobjc": send_notification_pyobjc,
+    "pync": send_notification_pync,
+    None: _send_notification_unavailable,
+}
+
+@functools.lru_cache(maxsize=None)
+def get_native_sender() -> Callable[[str, str, Optional[str]], bool]:
+    """
+    Get the sender for the available native backend, chosen once per process.
+
+    Returns:
+        A function taking (title, message, icon_path) and returning True on success
+    """
+    return _NATIVE_SENDERS[get_notification_backend()]
+
+def clear_native_backend_cache() -> None:
+    """Forget the imported native modules and chosen sender so they are looked up again."""
+    _foundation_classes.cache_clear()
+    _notification_center.cache_clear()
+    _pync_module.cache_clear()
+    get_native_sender.cache_clear()
@@ -2,44 +2,183 @@
 macOS-specific sound functions for Claude Notifications MCP Server.
 """
 
+import functools
 import logging
 import os
+import queue
+import shutil
 import subprocess
+import threading
+from typing import Any, Dict, Optional, Tuple
 
 logger = logging.getLogger("claude-notifications")
 
+# Standard location of the afplay binary on macOS
+DEFAULT_AFPLAY_PATH = "/usr/bin/afplay"
+
+def _find_afplay() -> Optional[str]:
+    """Locate afplay once, so spawning it never has to search PATH."""
+    if os.access(DEFAULT_AFPLAY_PATH, os.X_OK):
+        return DEFAULT_AFPLAY_PATH
+    return shutil.which("afplay")
+
+# Absolute path to afplay, or None when it isn't installed (e.g. not running on macOS)
+AFPLAY_PATH = _find_afplay()
+
+# afplay processes that have been spawned but not yet reaped
+_pending_processes: "queue.SimpleQueue[subprocess.Popen]" = queue.SimpleQueue()
+_reaper_thread: Optional[threading.Thread] = None
+_reaper_lock = threading.Lock()
+
+# Most recent afplay process for each sound file
+_last_processes: Dict[str, subprocess.Popen] = {}
+
+# NSSound instances keyed by file path, created on first playback
+_nssounds: Dict[str, Any] = {}
+
+def _reap_processes() -> None:
+    """
+    Wait on spawned afplay processes so they don't linger as zombies.
+    Runs forever on a daemon thread and logs any non-zero exit codes.
+    """
+    while True:
+        process = _pending_processes.get()
+        try:
+            _, stderr = process.communicate()
+            # A negative code means we terminated it to restart the sound
+            if process.returncode > 0:
+                logger.error(f"afplay exited with code {process.returncode}")
+                if stderr:
+                    logger.debug("afplay stderr: %s", stderr.decode(errors="replace"))
+        except Exception as e:
+            logger.error(f"Error waiting for afplay: {e}")
+
+def _ensure_reaper() -> None:
+    """Start the background reaper thread if it isn't running yet."""
+    global _reaper_thread
+    with _reaper_lock:
+        if _reaper_thread is None:
+            _reaper_thread = threading.Thread(
+                target=_reap_processes,
+                name="afplay-reaper",
+                daemon=True
+            )
+            _reaper_thread.start()
+
 def play_sound_afplay(sound_file: str) -> bool:
     """
     Play a sound file using macOS afplay command.
 
+    The afplay process is started without waiting for playback to finish, so this
+    returns as soon as the process has been spawned. A background thread reaps it.
+    The file is not checked here; sound paths are validated at startup and a missing
+    file shows up as a non-zero afplay exit code in the reaper's log.
+
     Args:
         sound_file: Path to the sound file to play
 
     Returns:
-        True if sound played successfully, False otherwise
+        True if playback was started successfully, False otherwise
     """
-    if not os.path.exists(sound_file):
-        logger.error(f"Sound file does not exist: {sound_file}")
+    if AFPLAY_PATH is None:
+        logger.debug("afplay command not found. Are you running on macOS?")
         return False
 
     try:
-        logger.info(f"Playing sound with afplay: {sound_file}")
-        subprocess.run(
-            ["afplay", sound_file],
-            check=True,
-            capture_output=True
+        logger.debug("Playing sound with afplay: %s", sound_file)
+        # Output is discarded unless debug logging wants afplay's error messages
+        stderr = subprocess.PIPE if logger.isEnabledFor(logging.DEBUG) else subprocess.DEVNULL
+        # Cut off the previous playback of this sound rather than overlapping it
+        previous = _last_processes.get(sound_file)
+        if previous is not None and previous.poll() is None:
+            previous.terminate()
+
+        # An absolute executable with close_fds=False and no preexec_fn lets subprocess
+        # launch afplay with posix_spawn() instead of fork()+exec(). Descriptors opened
+        # by Python are non-inheritable, so nothing leaks into the child, and stdin is
+        # redirected so afplay can't read from the MCP stdio pipe.
+        process = subprocess.Popen(
+            [AFPLAY_PATH, sound_file],
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.DEVNULL,
+            stderr=stderr,
+            close_fds=False
         )
-        logger.info("Sound played successfully")
+        _last_processes[sound_file] = process
+        _ensure_reaper()
+        _pending_processes.put(process)
+        logger.debug("Sound playback started")
         return True
-    except subprocess.CalledProcessError as e:
+    except Exception as e:
         logger.error(f"Error playing sound: {e}")
-        logger.error(f"stderr: {e.stderr.decode() if e.stderr else 'None'}")
         return False
-    except FileNotFoundError:
-        logger.error("afplay command not found. Are you running on macOS?")
+
+@functools.lru_cache(maxsize=None)
+def _nssound_class() -> Optional[Any]:
+    """Import AppKit's NSSound once; returns None when PyObjC is unavailable."""
+    try:
+        from AppKit import NSSound
+        return NSSound
+    except ImportError:
+        logger.info("PyObjC not available, sounds will be played with afplay")
+        return None
+
+def _get_nssound(sound_file: str) -> Optional[Any]:
+    """Get the cached NSSound for a file, loading it on first use."""
+    NSSound = _nssound_class()
+    if NSSound is None:
+        return None
+
+    sound = _nssounds.get(sound_file)
+    if sound is None:
+        sound = NSSound.alloc().initWithContentsOfFile_byReference_(sound_file, True)
+        if sound is None:
+            logger.warning(f"NSSound could not load sound file: {sound_file}")
+            return None
+        _nssounds[sound_file] = sound
+    return sound
+
+def load_sound_nssound(sound_file: str) -> bool:
+    """
+    Load a sound file into an NSSound without playing it, so the first
+    notification doesn't pay for loading the file.
+
+    Args:
+        sound_file: Path to the sound file to load
+
+    Returns:
+        True if the sound is ready to play, False otherwise
+    """
+    try:
+        return _get_nssound(sound_file) is not None
+    except Exception as e:
+        logger.warning(f"NSSound could not load sound: {e}")
         return False
+
+def play_sound_nssound(sound_file: str) -> bool:
+    """
+    Play a sound file in-process using AppKit's NSSound (requires PyObjC).
+
+    NSSound instances are cached per file, so repeated playback skips both the
+    afplay process spawn and reloading the file.
+
+    Args:
+        sound_file: Path to the sound file to play
+
+    Returns:
+        True if playback was started successfully, False otherwise
+    """
+    try:
+        sound = _get_nssound(sound_file)
+        if sound is None:
+            return False
+
+        # Restart the sound if the previous notification is still playing
+        sound.stop()
+        logger.debug("Playing sound with NSSound: %s", sound_file)
+        return bool(sound.play())
     except Exception as e:
-        logger.error(f"Unexpected error playing sound: {e}")
+        logger.warning(f"NSSound playback failed: {e}")
         return False
 
 def get_system_sounds_dir() -> str:
@@ -51,16 +190,23 @@ def get_system_sounds_dir() -> str:
     """
     return "/System/Library/Sounds/"
 
+@functools.lru_cache(maxsize=None)
+def _system_sound_names() -> Tuple[str, ...]:
+    """Scan the system sounds directory once (its contents don't change at runtime)."""
+    sounds_dir = get_system_sounds_dir()
+    try:
+        return tuple(f for f in os.listdir(sounds_dir) if f.endswith('.aiff'))
+    except Exception as e:
+        logger.error(f"Error listing system sounds: {e}")
+        return ()
+
 def list_available_system_sounds() -> list:
     """
     List all available system sounds on macOS.
 
+    The directory is only read on the first call.
+
     Returns:
         List of sound file names (without path)
     """
-    sounds_dir = get_system_sounds_dir()
-    try:
-        return [f for f in os.listdir(sounds_dir) if f.endswith('.aiff')]
-    except Exception as e:
-        logger.error(f"Error listing system sounds: {e}")
-        return []
+    return list(_system_sound_names())
@@ -2,45 +2,99 @@
 MCP server implementation for Claude Notifications.
 """
 
+import asyncio
+import functools
 import json
 import os
-import subprocess
-from typing import Dict
+import re
+import stat
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Optional, Tuple
 
 from fastmcp import FastMCP
 
 from notifications import __version__
 from notifications.core.notification_manager import NotificationManager
 from notifications.core.sound_manager import SoundManager
+from notifications.platform import IS_MACOS, log_unsupported_platform
+from notifications.platform.macos.notification import (
+    TERMINAL_NOTIFIER_PATH,
+    get_notification_backend,
+    preload_notification_icon,
+)
+from notifications.utils.config import debounce_seconds, get_config
 from notifications.utils.logging import setup_logging
 
 # Set up logging
 logger = setup_logging()
 
+# Messages matching this are treated as "start" notifications
+_START_PATTERN = re.compile(r"start|processing", re.IGNORECASE)
+
+# task_status's default message, which is classified without running the regex
+DEFAULT_MESSAGE = "Task completed"
+
+# notify-claude.sh in the project directory; used in place of the built-in methods
+# when CLAUDE_USE_HELPER_SCRIPT is set and the script is present
+HELPER_SCRIPT_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    "notify-claude.sh"
+)
+
+# Worker threads for the blocking part of task_status (visual notifications). Kept
+# small so a burst of calls can't fan out into dozens of concurrent
+# osascript/terminal-notifier processes.
+_NOTIFY_EXECUTOR = ThreadPoolExecutor(max_workers=2, thread_name_prefix="notify")
+
+# (title, notification type) keyed by whether the message is a start notification
+_NOTIFICATION_KINDS = {
+    True: ("Claude is Processing", "start"),
+    False: ("Claude Response Ready", "complete"),
+}
+
+# Shape of the task_status response; copied and filled in on each call
+_RESPONSE_TEMPLATE = {"status": "success", "message": "", "sound": None, "visual": False}
+
+@functools.lru_cache(maxsize=128)
+def is_start_message(message: str) -> bool:
+    """Check whether a task_status message announces the start of a task.
+
+    Memoized, since callers tend to repeat the same few messages verbatim.
+    """
+    return message != DEFAULT_MESSAGE and _START_PATTERN.search(message) is not None
+
 def verify_sounds() -> bool:
     """
-    Verify that the configured sound files exist and are playable.
+    Verify that the configured sound files exist and preload the ones that do.
 
     Returns:
         True if all sound files exist, False otherwise
     """
-    start_sound = SoundManager.get_notification_sound(is_start=True)
-    complete_sound = SoundManager.get_notification_sound(is_start=False)
+    start_sound, start_exists = SoundManager.get_notification_sound_verified(is_start=True)
+    complete_sound, complete_exists = SoundManager.get_notification_sound_verified(is_start=False)
 
     success = True
 
-    if not os.path.exists(start_sound):
+    if not start_exists:
         logger.warning(
             f"⚠️ Warning: Start notification sound file not found at {start_sound}"
         )
         success = False
 
-    if not os.path.exists(complete_sound):
+    if not complete_exists:
         logger.warning(
             f"⚠️ Warning: Completion notification sound file not found at {complete_sound}"
         )
         success = False
 
+    # Load the sounds now so the first notification doesn't wait on it
+    for sound_file, exists in ((start_sound, start_exists), (complete_sound, complete_exists)):
+        if exists:
+            SoundManager.preload_sound(sound_file)
+
     return success
 
 def verify_notification_components() -> bool:
@@ -51,17 +105,14 @@ def verify_notification_components() -> bool:
     Returns:
         True if all components are available, False otherwise
     """
-    import importlib.util
-
     success = True
 
-    # Check for PyObjC or pync
-    pyobjc_available = importlib.util.find_spec("Foundation") is not None
-    pync_available = importlib.util.find_spec("pync") is not None
+    # Check for PyObjC or pync (the import is cached for the senders to reuse)
+    backend = get_notification_backend()
 
-    if pyobjc_available:
+    if backend == "pyobjc":
         logger.info("✅ PyObjC is available for visual notifications")
-    elif pync_available:
+    elif backend == "pync":
         logger.info("✅ pync is available for visual notifications")
     else:
         logger.info(
@@ -71,51 +122,35 @@ def verify_notification_components() -> bool:
         # We don't mark success as False here since we have fallback options
 
     # Check for terminal-notifier as a fallback
-    try:
-        terminal_notifier_available = subprocess.run(
-            ["which", "terminal-notifier"],
-            capture_output=True
-        ).returncode == 0
-
-        if terminal_notifier_available:
-            logger.info("✅ terminal-notifier is available as a fallback")
-    except Exception:
-        terminal_notifier_available = False
+    if TERMINAL_NOTIFIER_PATH is not None:
+        logger.info("✅ terminal-notifier is available as a fallback")
+    else:
+        logger.info(
+            "ℹ️ terminal-notifier not found, install it with: brew install terminal-notifier"
+        )
 
     # Check notification icon
     icon_path = NotificationManager.get_notification_icon()
     if icon_path:
-        logger.info(f"✅ Notification icon found at {icon_path}")
+        logger.info("✅ Notification icon found at %s", icon_path)
+        if backend == "pyobjc":
+            preload_notification_icon(icon_path)
     else:
         logger.info("ℹ️ No notification icon found. Notifications will be sent without an icon.")
 
-    # Test notifications directly to ensure permissions
+    # Send one test notification to register with Notification Center. It already
+    # runs the full method chain, so a failure means every method has been tried.
     if NotificationManager.are_visual_notifications_enabled():
         try:
-            # Always send a test notification to trigger permission prompt
             logger.info("Sending test notification to register with Notification Center...")
-            test_result = NotificationManager.send_test_notification()
-
-            if test_result:
-                logger.info(
-                    "✅ Test notification sent successfully - permissions should be granted"
-                )
+            if NotificationManager.send_test_notification():
+                logger.info("✅ Notification Center registration complete")
             else:
-                logger.warning(
-                    "⚠️ Unable to send test notification - trying direct AppleScript method"
-                )
-                apple_result = NotificationManager.send_notification_applescript(
-                    "Claude Notification Server",
-                    "Testing notification permissions"
+                logger.warning("⚠️ All notification methods failed")
+                logger.info(
+                    "You can manually enable permissions in System Preferences > Notifications"
                 )
-                if apple_result:
-                    logger.info("✅ AppleScript notification succeeded")
-                else:
-                    logger.warning("⚠️ All notification methods failed")
-                    logger.info(
-                        "You can manually enable permissions in System Preferences > Notifications"
-                    )
-                    success = False
+                success = False
         except Exception as e:
             logger.warning(f"⚠️ Error checking notification permissions: {e}")
             success = False
@@ -124,6 +159,127 @@ def verify_notification_components() -> bool:
 
     return success
 
+@functools.lru_cache(maxsize=None)
+def is_helper_script_ready(helper_script: str) -> bool:
+    """
+    Check (once per path) that the helper script exists, making it executable if needed.
+
+    Args:
+        helper_script: Path to the helper script
+
+    Returns:
+        True if the script can be run, False otherwise
+    """
+    # One stat answers both whether the script exists and whether it is executable
+    try:
+        mode = os.stat(helper_script).st_mode
+    except OSError:
+        logger.debug("Helper script not found at %s, using built-in methods", helper_script)
+        return False
+
+    # Make the script executable if it isn't already
+    if not mode & stat.S_IXUSR:
+        try:
+            os.chmod(helper_script, 0o755)
+        except OSError as e:
+            logger.error(f"Could not make helper script executable: {e}")
+            return False
+    return True
+
+async def run_helper_script(
+    helper_script: str,
+    title: str,
+    message: str,
+    notification_type: str
+) -> Optional[Dict[str, Any]]:
+    """
+    Send the notification through the notify-claude.sh helper script, if present.
+
+    The script is run as an asyncio subprocess, so the event loop keeps serving other
+    requests while it runs.
+
+    Args:
+        helper_script: Path to the helper script
+        title: The notification title
+        message: The notification message
+        notification_type: "start" or "complete"
+
+    Returns:
+        The JSON object reported by the script, or None if the script is missing, failed
+        or reported anything other than an object
+    """
+    if not is_helper_script_ready(helper_script):
+        return None
+
+    try:
+        logger.debug("Using helper script: %s", helper_script)
+
+        # Run the helper script with title, message, and notification type
+        process = await asyncio.create_subprocess_exec(
+            helper_script, title, message, notification_type,
+            stdin=asyncio.subprocess.DEVNULL,  # keep the script off the MCP stdio pipe
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE
+        )
+        stdout, stderr = await process.communicate()
+
+        # Check if the script ran successfully
+        if process.returncode == 0:
+            logger.debug("Helper script ran successfully")
+
+            # Try to parse the JSON response from the script
+            try:
+                result = json.loads(stdout)
+                logger.debug("Script result: %s", result)
+                if isinstance(result, dict):
+                    return result
+                logger.warning("Script output is not a JSON object: %s", result)
+            except json.JSONDecodeError:
+                logger.warning("Could not parse script output: %s", stdout.decode(errors="replace"))
+        else:
+            logger.warning(f"Helper script failed with code {process.returncode}")
+            logger.warning("stderr: %s", stderr.decode(errors="replace"))
+
+    except Exception as e:
+        logger.error(f"Error running helper script: {e}")
+
+    # Fall through to the built-in methods if the helper script fails
+    return None
+
+def send_visual_notification(title: str, message: str) -> bool:
+    """
+    Send a visual notification through the NotificationManager fallback chain,
+    trying terminal-notifier first (it can show the icon).
+
+    The first method that succeeds ends the attempt; each runs under its own
+    subprocess timeout.
+
+    Args:
+        title: The notification title
+        message: The notification message
+
+    Returns:
+        True if any method delivered the notification, False otherwise
+    """
+    if not IS_MACOS:
+        log_unsupported_platform()
+        return False
+
+    try:
+        icon_path = NotificationManager.get_notification_icon()
+
+        visual_success = NotificationManager.send_notification(
+            title=title,
+            message=message,
+            icon_path=icon_path,
+            prefer_icon=True
+        )
+        logger.debug("Notification chain result: %s", visual_success)
+        return visual_success
+    except Exception as e:
+        logger.error(f"Error sending visual notification: {e}")
+        return False
+
 class NotificationServer:
     """
     MCP server for Claude Desktop notifications.
@@ -132,6 +288,11 @@ class NotificationServer:
     def __init__(self):
         """Initialize the notification server."""
         self.mcp = FastMCP("notify-user")
+        # Sound files are verified on the first notification unless main() already did
+        self.sounds_verified = False
+        # (time.monotonic(), pending response) of the last dispatched notification,
+        # keyed by notification type
+        self._last_dispatched: Dict[str, Tuple[float, asyncio.Future]] = {}
         self._setup_tools()
 
     @property
@@ -142,7 +303,7 @@ class NotificationServer:
     def _setup_tools(self):
         """Set up MCP tools."""
         @self.mcp.tool()
-        def task_status(message: str = "Task completed") -> Dict[str, str]:
+        async def task_status(message: str = DEFAULT_MESSAGE) -> Dict[str, Any]:
             """
             ‼️ MANDATORY: Sends notifications (sound and visual) for the user.
 
@@ -162,122 +323,86 @@ class NotificationServer:
             Returns:
                 dict: Status information about the notification
             """
-            logger.info(f"Notification: {message}")
+            logger.debug("Notification: %s", message)
 
-            # Determine if this is a start or completion notification
-            is_start = "start" in message.lower() or "processing" in message.lower()
-            notification_type = "start" if is_start else "complete"
+            sound_enabled = SoundManager.are_sound_notifications_enabled()
+            visual_enabled = NotificationManager.are_visual_notifications_enabled()
 
-            # Set appropriate titles based on notification type
-            if is_start:
-                title = "Claude is Processing"
-            else:
-                title = "Claude Response Ready"
+            # Nothing to do when both kinds of notification are turned off
+            if not (sound_enabled or visual_enabled):
+                response = _RESPONSE_TEMPLATE.copy()
+                response["message"] = message
+                return response
 
-            # Path to helper script (look in project directory first, then home directory)
-            helper_script = os.path.join(
-                os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
-                "notify-claude.sh"
+            # Determine if this is a start or completion notification
+            is_start = is_start_message(message)
+            title, notification_type = _NOTIFICATION_KINDS[is_start]
+
+            # Coalesce a burst of same-type calls into the notification already sent,
+            # answering them with that notification's result
+            now = time.monotonic()
+            last_dispatched = self._last_dispatched.get(notification_type)
+            if last_dispatched is not None and now - last_dispatched[0] < debounce_seconds():
+                logger.debug("Coalescing repeated %s notification", notification_type)
+                response = dict(await asyncio.shield(last_dispatched[1]))
+                response["message"] = message
+                return response
+
+            dispatch = asyncio.ensure_future(self._dispatch(
+                message, is_start, title, notification_type, sound_enabled, visual_enabled
+            ))
+            self._last_dispatched[notification_type] = (now, dispatch)
+            return dict(await asyncio.shield(dispatch))
+
+    async def _dispatch(self, message: str, is_start: bool, title: str,
+                        notification_type: str, sound_enabled: bool,
+                        visual_enabled: bool) -> Dict[str, Any]:
+        """Send the sound and visual notification for one task_status call."""
+        # If the helper script is enabled and exists, use it as the primary notification
+        # method. It runs as an asyncio subprocess so the event loop stays free meanwhile.
+        if get_config().use_helper_script and is_helper_script_ready(HELPER_SCRIPT_PATH):
+            result = await run_helper_script(
+                HELPER_SCRIPT_PATH, title, message, notification_type
+            )
+        else:
+            result = None
+        if result is not None:
+            return result
+
+        # If we reach here, the helper script is disabled, missing, or failed
+        # Fall back to the original implementation
+
+        # Start the visual notification on a worker thread first so it is delivered
+        # concurrently with the sound below. run_in_executor submits to the thread pool
+        # immediately (unlike to_thread, which waits for the next await to be scheduled)
+        visual_task = None
+        if visual_enabled:
+            visual_task = asyncio.get_running_loop().run_in_executor(
+                _NOTIFY_EXECUTOR, send_visual_notification, title, message
             )
 
-            # If helper script exists, use it as the primary notification method
-            if os.path.exists(helper_script):
-                try:
-                    logger.info(f"Using helper script: {helper_script}")
-
-                    # Make the script executable if it isn't already
-                    if not os.access(helper_script, os.X_OK):
-                        os.chmod(helper_script, 0o755)
-
-                    # Run the helper script with title, message, and notification type
-                    process = subprocess.run(
-                        [helper_script, title, message, notification_type],
-                        capture_output=True,
-                        text=True,
-                        check=False  # Don't raise exception on non-zero exit
-                    )
-
-                    # Check if the script ran successfully
-                    if process.returncode == 0:
-                        logger.info("Helper script ran successfully")
-
-                        # Try to parse the JSON response from the script
-                        try:
-                            result = json.loads(process.stdout.strip())
-                            logger.info(f"Script result: {result}")
-                            return result
-                        except json.JSONDecodeError:
-                            logger.warning(f"Could not parse script output: {process.stdout}")
-                    else:
-                        logger.warning(f"Helper script failed with code {process.returncode}")
-                        logger.warning(f"stderr: {process.stderr}")
-
-                except Exception as e:
-                    logger.error(f"Error running helper script: {e}")
-                    # Fall through to original methods if helper script fails
-            else:
-                logger.info(f"Helper script not found at {helper_script}, using built-in methods")
-
-            # If we reach here, the helper script either doesn't exist or failed
-            # Fall back to the original implementation
+        # Send sound notification (playback is started without waiting for it)
+        sound_success = False
+        if sound_enabled:
+            if not self.sounds_verified:
+                self.sounds_verified = True
+                verify_sounds()
 
-            # Send sound notification
             sound_file = SoundManager.get_notification_sound(is_start=is_start)
             sound_success = SoundManager.play_sound(sound_file)
 
-            # Visual notification
-            visual_success = False
-            visual_enabled = NotificationManager.are_visual_notifications_enabled()
+        visual_success = False
+        if visual_task is not None:
+            visual_success = await visual_task
 
-            if visual_enabled:
-                try:
-                    # Get icon path
-                    icon_path = NotificationManager.get_notification_icon()
-
-                    # Try terminal-notifier directly first for MCP context
-                    try:
-                        visual_success = NotificationManager.send_notification_terminal_notifier(
-                            title=title,
-                            message=message,
-                            sound=None,  # Don't duplicate sound
-                            icon_path=icon_path
-                        )
-                        logger.info(f"Terminal-notifier result: {visual_success}")
-                    except Exception as e:
-                        logger.error(f"Terminal-notifier failed: {e}")
-
-                    # If terminal-notifier failed, try AppleScript directly
-                    if not visual_success:
-                        try:
-                            visual_success = NotificationManager.send_notification_applescript(
-                                title=title,
-                                message=message
-                            )
-                            logger.info(f"AppleScript result: {visual_success}")
-                        except Exception as e:
-                            logger.error(f"AppleScript failed: {e}")
-
-                    # If both direct methods failed, try the full notification stack
-                    if not visual_success:
-                        try:
-                            visual_success = NotificationManager.send_notification(
-                                title=title,
-                                message=message,
-                                icon_path=icon_path
-                            )
-                            logger.info(f"Full notification stack result: {visual_success}")
-                        except Exception as e:
-                            logger.error(f"Full notification stack failed: {e}")
-
-                except Exception as e:
-                    logger.error(f"Error sending visual notification: {e}")
-
-            return {
-                "status": "success" if (sound_success or visual_success) else "error",
-                "message": message,
-                "sound": sound_file if sound_success else None,
-                "visual": visual_success
-            }
+        response = _RESPONSE_TEMPLATE.copy()
+        response["message"] = message
+        if sound_success:
+            response["sound"] = sound_file
+        response["visual"] = visual_success
+        if not (sound_success or visual_success):
+            response["status"] = "error"
+        return response
 
     def run(self):
         """Run the notification server."""
@@ -292,33 +417,46 @@ class NotificationServer:
 
 def main():
     """Main entry point for the notification server."""
-    print(f"🔔 Claude Notification Server v{__version__}")
-    print("📋 Available tool:")
-    print("  • task_status: MUST be used at the start and end of every interaction")
+    # When an MCP client launches the server, stdout is the protocol pipe: only print
+    # the banner and verification summary for interactive runs
+    interactive = sys.stdout.isatty()
 
-    # Verify components
-    sound_success = verify_sounds()
+    def report(text: str) -> None:
+        if interactive:
+            print(text)
 
-    if sound_success:
-        print("✅ All sound files verified")
+    server = NotificationServer()
+
+    report(f"🔔 Claude Notification Server v{__version__}")
+    report("📋 Available tool:")
+    report("  • task_status: MUST be used at the start and end of every interaction")
+
+    # Verify (and preload) the sound files before the first notification. Interactive
+    # runs report the result; otherwise it happens on a background thread so startup
+    # isn't held up but the audio backend is warm by the time the first call arrives
+    server.sounds_verified = True
+    if interactive:
+        if verify_sounds():
+            report("✅ All sound files verified")
+        else:
+            report("⚠️ Some sound files could not be found. Check configurations.")
     else:
-        print("⚠️ Some sound files could not be found. Check configurations.")
+        threading.Thread(target=verify_sounds, name="sound-preload", daemon=True).start()
 
     # Now handle visual notifications with explicit permission check
     if NotificationManager.are_visual_notifications_enabled():
-        print("🔔 Visual notifications are enabled, configuring...")
+        report("🔔 Visual notifications are enabled, configuring...")
         visual_success = verify_notification_components()
 
         if visual_success:
-            print("✅ Visual notification components verified")
+            report("✅ Visual notification components verified")
         else:
-            print("⚠️ Visual notifications may not work correctly. See warnings above.")
-            print("💡 Try running: python3 test_notification.py for more detailed testing")
+            report("⚠️ Visual notifications may not work correctly. See warnings above.")
+            report("💡 Try running: python3 test_notification.py for more detailed testing")
     else:
-        print("ℹ️ Visual notifications are disabled")
+        report("ℹ️ Visual notifications are disabled")
 
-    # Create and run the server
-    server = NotificationServer()
+    # Run the server
     return server.run()
 
 if __name__ == "__main__":
@@ -4,6 +4,8 @@ Configuration constants and helpers for Claude Notifications MCP Server.
 
 import logging
 import os
+from dataclasses import dataclass
+from typing import Optional
 
 logger = logging.getLogger("claude-notifications")
 
@@ -11,12 +13,28 @@ logger = logging.getLogger("claude-notifications")
 ENV_START_SOUND = "CLAUDE_START_SOUND"
 ENV_COMPLETE_SOUND = "CLAUDE_COMPLETE_SOUND"
 ENV_VISUAL_NOTIFICATIONS = "CLAUDE_VISUAL_NOTIFICATIONS"
+ENV_SOUND_NOTIFICATIONS = "CLAUDE_SOUND_NOTIFICATIONS"
+ENV_USE_HELPER_SCRIPT = "CLAUDE_USE_HELPER_SCRIPT"
 ENV_NOTIFICATION_ICON = "CLAUDE_NOTIFICATION_ICON"
+ENV_DEBOUNCE_MS = "CLAUDE_NOTIFY_DEBOUNCE_MS"
+ENV_LOG_LEVEL = "CLAUDE_NOTIFY_LOG_LEVEL"
+
+# Repeat notifications within this many milliseconds are coalesced
+DEFAULT_DEBOUNCE_MS = 500
+
+# Default log level (INFO/DEBUG output is opt-in via ENV_LOG_LEVEL)
+DEFAULT_LOG_LEVEL = logging.WARNING
 
 # Default system sounds
 DEFAULT_START_SOUND = "Glass.aiff"
 DEFAULT_COMPLETE_SOUND = "Hero.aiff"
 SYSTEM_SOUNDS_DIR = "/System/Library/Sounds/"
+# Full default sound paths (SYSTEM_SOUNDS_DIR already ends with a separator)
+DEFAULT_START_PATH = SYSTEM_SOUNDS_DIR + DEFAULT_START_SOUND
+DEFAULT_COMPLETE_PATH = SYSTEM_SOUNDS_DIR + DEFAULT_COMPLETE_SOUND
+
+# Values accepted as "true" by get_env_bool
+TRUE_STRINGS = frozenset({"true", "1", "yes", "y", "on"})
 
 # Default icon paths
 def get_project_root():
@@ -38,7 +56,53 @@ def get_env_bool(env_var: str, default: bool = True) -> bool:
         Boolean value
     """
     value = os.environ.get(env_var, str(default)).lower()
-    return value in ("true", "1", "yes", "y", "on")
+    return value in TRUE_STRINGS
+
+def get_env_int(env_var: str, default: int) -> int:
+    """
+    Get an integer value from an environment variable.
+
+    Args:
+        env_var: Environment variable name
+        default: Default value if the environment variable is not set or invalid
+
+    Returns:
+        Integer value
+    """
+    value = os.environ.get(env_var)
+    if not value:
+        return default
+
+    try:
+        return int(value)
+    except ValueError:
+        logger.warning(f"Invalid {env_var} value: {value}")
+        return default
+
+def get_env_log_level(env_var: str, default: int = DEFAULT_LOG_LEVEL) -> int:
+    """
+    Get a logging level from an environment variable.
+
+    Args:
+        env_var: Environment variable name
+        default: Default level if the environment variable is not set or invalid
+
+    Returns:
+        Numeric logging level
+    """
+    value = os.environ.get(env_var)
+    if not value:
+        return default
+
+    if value.isdigit():
+        return int(value)
+
+    level = logging.getLevelName(value.strip().upper())
+    if isinstance(level, int):
+        return level
+
+    logger.warning(f"Invalid {env_var} value: {value}")
+    return default
 
 def get_env_path(env_var: str, default_path: str = None) -> str:
     """
@@ -53,11 +117,64 @@ def get_env_path(env_var: str, default_path: str = None) -> str:
     """
     path = os.environ.get(env_var)
     if path and os.path.exists(path):
-        logger.info(f"Using path from {env_var}: {path}")
+        logger.info("Using path from %s: %s", env_var, path)
         return path
 
     if default_path and os.path.exists(default_path):
-        logger.info(f"Using default path: {default_path}")
+        logger.info("Using default path: %s", default_path)
         return default_path
 
     return None
+
+@dataclass(frozen=True)
+class EnvConfig:
+    """
+    Snapshot of every environment setting the server reads. The environment doesn't
+    change under a running server, so it is parsed once and then read as attributes.
+    """
+    start_sound: Optional[str]
+    complete_sound: Optional[str]
+    sound_enabled: bool
+    visual_enabled: bool
+    icon_path: Optional[str]
+    use_helper_script: bool
+    debounce_ms: int
+    log_level: int
+
+    @classmethod
+    def from_environ(cls) -> "EnvConfig":
+        """Parse the current environment."""
+        return cls(
+            start_sound=os.environ.get(ENV_START_SOUND),
+            complete_sound=os.environ.get(ENV_COMPLETE_SOUND),
+            sound_enabled=get_env_bool(ENV_SOUND_NOTIFICATIONS),
+            visual_enabled=get_env_bool(ENV_VISUAL_NOTIFICATIONS),
+            icon_path=os.environ.get(ENV_NOTIFICATION_ICON),
+            use_helper_script=get_env_bool(ENV_USE_HELPER_SCRIPT, default=False),
+            debounce_ms=get_env_int(ENV_DEBOUNCE_MS, DEFAULT_DEBOUNCE_MS),
+            log_level=get_env_log_level(ENV_LOG_LEVEL),
+        )
+
+# Parsed on first use by get_config()
+_config: Optional[EnvConfig] = None
+
+def get_config() -> EnvConfig:
+    """
+    Get the environment configuration, parsing it on first use.
+
+    Returns:
+        The cached EnvConfig
+    """
+    global _config
+    if _config is None:
+        _config = EnvConfig.from_environ()
+    return _config
+
+def debounce_seconds() -> float:
+    """Get the window in which repeat notifications are coalesced, in seconds."""
+    return max(get_config().debounce_ms, 0) / 1000
+
+def reload_config() -> None:
+    """Discard the cached configuration so the environment is parsed again on next use."""
+    global _config
+    _config = None
@@ -5,32 +5,41 @@ Logging setup for Claude Notifications MCP Server.
 import logging
 import sys
 
+from notifications.utils.config import get_config
 
-def setup_logging(level=logging.INFO):
+
+def setup_logging(level=None):
     """
     Set up logging for the notification server.
 
     Args:
-        level: Logging level (default: INFO)
+        level: Logging level (default: CLAUDE_NOTIFY_LOG_LEVEL, or WARNING if unset)
     """
-    logging.basicConfig(
-        level=level,
-        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-        stream=sys.stdout
-    )
+    if level is None:
+        level = get_config().log_level
+
+    # The formatter only uses levelname and message, so don't collect the process,
+    # thread and multiprocessing details for every record
+    logging.logProcesses = False
+    logging.logThreads = False
+    logging.logMultiprocessing = False
 
     # Create logger
     logger = logging.getLogger("claude-notifications")
     logger.setLevel(level)
 
+    # Keep records off the root logger: basicConfig's stdout handler would both
+    # duplicate every line and write into the MCP stdio transport
+    logger.propagate = False
+
     # Ensure we don't add duplicate handlers
     if not logger.handlers:
-        # Create console handler
-        handler = logging.StreamHandler()
+        # Create console handler (stderr)
+        handler = logging.StreamHandler(sys.stderr)
         handler.setLevel(level)
 
-        # Create formatter
-        formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+        # Minimal formatter: no asctime, which is the most expensive field to render
+        formatter = logging.Formatter("{levelname} {message}", style="{")
         handler.setFormatter(formatter)
 
         # Add handler to logger
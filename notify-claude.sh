@@ -43,13 +43,8 @@ fi
 
 # If terminal-notifier failed or doesn't exist, try AppleScript
 if [[ $NOTIFY_STATUS -ne 0 ]]; then
-    # Enhanced AppleScript approach
-    osascript <<EOF
-    tell application "System Events"
-        display notification "$MESSAGE" with title "$TITLE"
-    end tell
-    delay 0.5
-EOF
+    # Pass the text as arguments so quotes in it can't break out of the script
+    osascript -e 'on run argv' -e 'display notification (item 2 of argv) with title (item 1 of argv)' -e 'end run' "$TITLE" "$MESSAGE"
     NOTIFY_STATUS=$?
 fi
 
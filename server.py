@@ -3,20 +3,19 @@
 Entry point for Claude Notifications MCP Server.
 """
 
-import logging
 import sys
 
 from notifications.server import NotificationServer, main
 
-# Set up logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
-logger = logging.getLogger("claude-notifications")
 
-# Create a server object for fastmcp to find
-server = NotificationServer()
+def server():
+    """
+    Build the FastMCP server on demand, for `fastmcp run server.py:server`.
+
+    Nothing is constructed at import, so running this file directly (which goes
+    through main()) or importing it doesn't set up the server twice.
+    """
+    return NotificationServer().mcp
 
 if __name__ == "__main__":
     sys.exit(main())
@@ -4,6 +4,7 @@ Simple test script to verify macOS notifications are working properly.
 This can help diagnose issues with the Claude MCP notification server.
 """
 
+import shutil
 import subprocess
 
 from Foundation import NSUserNotification, NSUserNotificationCenter
@@ -52,7 +53,8 @@ def test_applescript_notification():
         # Run the AppleScript
         subprocess.run(
             ["osascript", "-e", script],
-            capture_output=True,
+            stdout=subprocess.DEVNULL,  # only stderr is shown (on failure)
+            stderr=subprocess.PIPE,
             text=True,
             check=True
         )
@@ -79,7 +81,9 @@ def test_sound():
         # Play the sound
         subprocess.run(
             ["afplay", sound_file],
-            capture_output=True,
+            stdout=subprocess.DEVNULL,  # only stderr is shown (on failure)
+            stderr=subprocess.PIPE,
+            text=True,
             check=True
         )
 
@@ -100,13 +104,7 @@ def test_terminal_notifier():
         print("Testing terminal-notifier...")
 
         # Check if terminal-notifier is installed
-        which_result = subprocess.run(
-            ["which", "terminal-notifier"],
-            capture_output=True,
-            text=True
-        )
-
-        if which_result.returncode != 0:
+        if shutil.which("terminal-notifier") is None:
             print(
                 "terminal-notifier is not installed. Install it with: "
                 "brew install terminal-notifier"
@@ -121,7 +119,8 @@ def test_terminal_notifier():
                 "-message", "This is a test notification from terminal-notifier",
                 "-sound", "Glass"
             ],
-            capture_output=True,
+            stdout=subprocess.DEVNULL,  # only stderr is shown (on failure)
+            stderr=subprocess.PIPE,
             text=True,
             check=True
         )
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+
+import unittest
+from unittest.mock import MagicMock, patch
+
+from notifications.platform.macos import coreaudio
+
+
+class TestCoreAudio(unittest.TestCase):
+    """Tests for the AudioToolbox bindings, with the frameworks stubbed out."""
+
+    def setUp(self):
+        # Start every test with no loaded frameworks and no registered sounds
+        coreaudio._load_frameworks.cache_clear()
+        coreaudio._sound_ids.clear()
+        self.addCleanup(coreaudio._load_frameworks.cache_clear)
+        self.addCleanup(coreaudio._sound_ids.clear)
+
+        self.audio_toolbox = MagicMock()
+        self.core_foundation = MagicMock()
+        self.core_foundation.CFURLCreateFromFileSystemRepresentation.return_value = 1234
+
+        def create_sound_id(url, sound_id_ref):
+            sound_id_ref._obj.value = 42
+            return 0
+        self.audio_toolbox.AudioServicesCreateSystemSoundID.side_effect = create_sound_id
+        self.audio_toolbox.AudioServicesSetProperty.return_value = 0
+
+        libraries = {
+            coreaudio.AUDIO_TOOLBOX_PATH: self.audio_toolbox,
+            coreaudio.CORE_FOUNDATION_PATH: self.core_foundation,
+        }
+        cdll_patcher = patch.object(coreaudio.ctypes, 'CDLL', side_effect=libraries.__getitem__)
+        cdll_patcher.start()
+        self.addCleanup(cdll_patcher.stop)
+
+    def test_play_sound_caches_sound_id(self):
+        """Test that each file is registered once and its URL released."""
+        self.assertTrue(coreaudio.play_sound_audiotoolbox("/tmp/Glass.aiff"))
+        self.assertTrue(coreaudio.play_sound_audiotoolbox("/tmp/Glass.aiff"))
+
+        self.audio_toolbox.AudioServicesCreateSystemSoundID.assert_called_once()
+        self.core_foundation.CFRelease.assert_called_once_with(1234)
+        self.assertEqual(self.audio_toolbox.AudioServicesPlaySystemSound.call_count, 2)
+        self.audio_toolbox.AudioServicesPlaySystemSound.assert_called_with(42)
+
+    def test_sound_id_is_not_ui_sound(self):
+        """Test that new sound IDs are switched off the UI sound effects volume."""
+        self.assertTrue(coreaudio.load_sound_audiotoolbox("/tmp/Glass.aiff"))
+
+        args = self.audio_toolbox.AudioServicesSetProperty.call_args[0]
+        self.assertEqual(args[0], coreaudio.K_AUDIO_SERVICES_PROPERTY_IS_UI_SOUND)
+        self.assertEqual(args[4]._obj.value, 0)
+
+    def test_create_sound_id_failure(self):
+        """Test that a non-zero OSStatus is reported as a failure and not cached."""
+        self.audio_toolbox.AudioServicesCreateSystemSoundID.side_effect = None
+        self.audio_toolbox.AudioServicesCreateSystemSoundID.return_value = -50
+
+        self.assertFalse(coreaudio.play_sound_audiotoolbox("/tmp/Glass.aiff"))
+
+        self.core_foundation.CFRelease.assert_called_once_with(1234)
+        self.audio_toolbox.AudioServicesPlaySystemSound.assert_not_called()
+        self.assertNotIn("/tmp/Glass.aiff", coreaudio._sound_ids)
+
+    def test_set_property_failure(self):
+        """Test that a sound that can't be made a regular sound falls back to other players."""
+        self.audio_toolbox.AudioServicesSetProperty.return_value = -50
+
+        self.assertFalse(coreaudio.play_sound_audiotoolbox("/tmp/Glass.aiff"))
+
+        self.audio_toolbox.AudioServicesDisposeSystemSoundID.assert_called_once()
+        self.audio_toolbox.AudioServicesPlaySystemSound.assert_not_called()
+
+    def test_frameworks_unavailable(self):
+        """Test that a missing AudioToolbox reports failure without raising."""
+        with patch.object(coreaudio.ctypes, 'CDLL', side_effect=OSError("not found")):
+            self.assertFalse(coreaudio.play_sound_audiotoolbox("/tmp/Glass.aiff"))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+
+import os
+import subprocess
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from notifications.platform.macos import notification
+
+
+class TestNotifyScriptArgs(unittest.TestCase):
+    """Tests for compiling the AppleScript notification script, with osacompile stubbed."""
+
+    def setUp(self):
+        # Compile into a temporary cache directory, starting with nothing compiled
+        cache_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(cache_dir.cleanup)
+        self.cache_dir = cache_dir.name
+        for patcher in (
+            patch.object(notification, 'SCRIPT_CACHE_DIR', self.cache_dir),
+            patch.object(notification.shutil, 'which', return_value='/usr/bin/osacompile'),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        notification._notify_script_args.cache_clear()
+        self.addCleanup(notification._notify_script_args.cache_clear)
+        self.source_args = tuple(
+            arg for line in notification.NOTIFY_SCRIPT_SOURCE for arg in ("-e", line)
+        )
+
+    @patch('subprocess.run')
+    def test_compiled_script_replaces_cache_on_success(self, mock_run):
+        """Test that the script is compiled to a temporary file and then moved into place."""
+        def compile_script(args, **kwargs):
+            with open(args[2], 'w') as f:
+                f.write('compiled')
+        mock_run.side_effect = compile_script
+
+        (compiled,) = notification._notify_script_args()
+
+        self.assertEqual(os.path.dirname(compiled), self.cache_dir)
+        self.assertNotEqual(mock_run.call_args[0][0][2], compiled)
+        self.assertEqual(os.listdir(self.cache_dir), [os.path.basename(compiled)])
+
+    @patch('subprocess.run')
+    def test_failed_compile_leaves_no_file(self, mock_run):
+        """Test that an interrupted compile falls back to -e and leaves nothing cached."""
+        def compile_script(args, **kwargs):
+            with open(args[2], 'w') as f:
+                f.write('trunc')
+            raise subprocess.TimeoutExpired(args, 5)
+        mock_run.side_effect = compile_script
+
+        self.assertEqual(notification._notify_script_args(), self.source_args)
+        self.assertEqual(os.listdir(self.cache_dir), [])
+
+    @patch('subprocess.run')
+    def test_existing_script_is_reused(self, mock_run):
+        """Test that an already compiled script is used without running osacompile."""
+        mock_run.side_effect = AssertionError("osacompile should not run")
+        checksum = notification.zlib.crc32("\n".join(notification.NOTIFY_SCRIPT_SOURCE).encode())
+        compiled = os.path.join(self.cache_dir, f"notify-{checksum:08x}.scpt")
+        open(compiled, 'w').close()
+
+        self.assertEqual(notification._notify_script_args(), (compiled,))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -2,12 +2,8 @@
 Test the modular structure of the Claude Notifications MCP Server.
 """
 
-import os
-import sys
 import unittest
 
-# Add the parent directory to the path so we can import the package
-sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 class TestModularStructure(unittest.TestCase):
     """Test the modular structure of the Claude Notifications MCP Server."""
@@ -1,29 +1,51 @@
 #!/usr/bin/env python3
 
 import os
-import sys
 import tempfile
 import unittest
 from unittest.mock import MagicMock, patch
 
-# Add the parent directory to the path to import the notification modules
-sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
-
 # Import from the new modular structure
+from notifications.core import notification_manager
 from notifications.core.notification_manager import NotificationManager
+from notifications.platform.macos import notification
 
 
 class TestNotificationManager(unittest.TestCase):
     """Tests for the NotificationManager class."""
 
-    def setUp(self):
-        # Create a temporary icon file for testing
-        self.temp_file = tempfile.NamedTemporaryFile(suffix='.png', delete=False)
-        self.temp_file.close()
+    @classmethod
+    def setUpClass(cls):
+        # Create one temporary icon file for the whole class (tests only read it)
+        fd, cls.temp_path = tempfile.mkstemp(suffix='.png')
+        os.close(fd)
 
-    def tearDown(self):
+        # Stand-ins for the optional native modules, shared by the tests that patch them in
+        cls.fake_foundation = MagicMock()
+        cls.fake_objc = MagicMock()
+        cls.fake_pync = MagicMock()
+
+    @classmethod
+    def tearDownClass(cls):
         # Remove the temporary file
-        os.unlink(self.temp_file.name)
+        os.unlink(cls.temp_path)
+
+    def setUp(self):
+        # Start every test with fresh cached settings
+        NotificationManager.clear_cache()
+
+        # Behave as if running on macOS, regardless of the host platform
+        platform_patcher = patch.object(notification_manager, 'IS_MACOS', True)
+        platform_patcher.start()
+        self.addCleanup(platform_patcher.stop)
+
+        # Keep the registration marker out of the real cache directory
+        marker_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(marker_dir.cleanup)
+        self.marker_path = os.path.join(marker_dir.name, 'registered')
+        marker_patcher = patch.object(NotificationManager, 'REGISTRATION_MARKER', self.marker_path)
+        marker_patcher.start()
+        self.addCleanup(marker_patcher.stop)
 
     def test_are_visual_notifications_enabled_default(self):
         """Test that visual notifications are enabled by default."""
@@ -34,24 +56,44 @@ class TestNotificationManager(unittest.TestCase):
     def test_are_visual_notifications_enabled_false(self):
         """Test that visual notifications can be disabled via environment variables."""
         # Set environment variable to disable notifications
+        env_var = NotificationManager.ENV_VISUAL_NOTIFICATIONS
+        is_enabled = NotificationManager.are_visual_notifications_enabled
         for value in ["false", "0", "no", "n", "off"]:
-            with patch.dict(os.environ, {NotificationManager.ENV_VISUAL_NOTIFICATIONS: value}):
-                self.assertFalse(NotificationManager.are_visual_notifications_enabled())
+            with self.subTest(value=value):
+                NotificationManager.clear_cache()
+                with patch.dict(os.environ, {env_var: value}):
+                    self.assertFalse(is_enabled())
 
     def test_are_visual_notifications_enabled_true(self):
         """Test that visual notifications can be enabled via environment variables."""
         # Set environment variable to enable notifications
+        env_var = NotificationManager.ENV_VISUAL_NOTIFICATIONS
+        is_enabled = NotificationManager.are_visual_notifications_enabled
         for value in ["true", "1", "yes", "y", "on"]:
-            with patch.dict(os.environ, {NotificationManager.ENV_VISUAL_NOTIFICATIONS: value}):
-                self.assertTrue(NotificationManager.are_visual_notifications_enabled())
+            with self.subTest(value=value):
+                NotificationManager.clear_cache()
+                with patch.dict(os.environ, {env_var: value}):
+                    self.assertTrue(is_enabled())
 
     def test_get_notification_icon_custom(self):
         """Test that custom icon path is used when environment variable is set."""
         # Set custom icon path in environment variable
         env_var = NotificationManager.ENV_NOTIFICATION_ICON
-        with patch.dict(os.environ, {env_var: self.temp_file.name}):
+        with patch.dict(os.environ, {env_var: self.temp_path}):
             icon_path = NotificationManager.get_notification_icon()
-            self.assertEqual(icon_path, self.temp_file.name)
+            self.assertEqual(icon_path, self.temp_path)
+
+    @patch('os.path.exists')
+    def test_get_notification_icon_cached(self, mock_exists):
+        """Test that the icon lookup only touches the filesystem once."""
+        mock_exists.return_value = False
+
+        with patch.dict(os.environ, {}, clear=True):
+            NotificationManager.get_notification_icon()
+            calls = mock_exists.call_count
+            self.assertIsNone(NotificationManager.get_notification_icon())
+
+        self.assertEqual(mock_exists.call_count, calls)
 
     @patch('os.path.exists')
     def test_get_notification_icon_default(self, mock_exists):
@@ -78,61 +120,90 @@ class TestNotificationManager(unittest.TestCase):
             icon_path = NotificationManager.get_notification_icon()
             self.assertIsNone(icon_path)
 
-    @patch('notifications.core.notification_manager.NotificationManager.send_notification')
-    def test_send_notification_with_pyobjc(self, mock_send):
-        """Test sending a notification with PyObjC."""
-        # Mock the Foundation module
-        with patch.dict('sys.modules', {
-            'Foundation': MagicMock(),
-            'objc': MagicMock()
-        }):
-            # Configure mock to indicate success
-            mock_send.return_value = True
-
-            # Call send_notification
-            result = NotificationManager.send_notification(
-                title="Test Title",
-                message="Test Message",
-                icon_path=self.temp_file.name
-            )
-
-            # Check that the function returned True
-            self.assertTrue(result)
-
-            # Check that send_notification was called with the correct arguments
-            mock_send.assert_called_once_with(
-                title="Test Title",
-                message="Test Message",
-                icon_path=self.temp_file.name
-            )
+    def test_get_native_sender(self):
+        """Test that the native sender follows the backend that can be imported."""
+        scenarios = {
+            'pyobjc': ({'Foundation': self.fake_foundation, 'objc': self.fake_objc},
+                       notification.send_notification_pyobjc),
+            'pync': ({'Foundation': None, 'pync': self.fake_pync},
+                     notification.send_notification_pync),
+            'none': ({'Foundation': None, 'pync': None},
+                     notification._send_notification_unavailable),
+        }
+        # Don't leave the last scenario's backend cached for other tests
+        self.addCleanup(NotificationManager.clear_cache)
+        for backend, (modules, sender) in scenarios.items():
+            with self.subTest(backend=backend), patch.dict('sys.modules', modules):
+                # Drop the backend chosen by the previous scenario
+                NotificationManager.clear_cache()
+                self.assertIs(notification.get_native_sender(), sender)
+
+    @patch.object(NotificationManager, 'send_notification_terminal_notifier', return_value=True)
+    @patch.object(NotificationManager, 'send_notification_applescript', return_value=False)
+    def test_send_notification_remembers_method(self, mock_applescript, mock_notifier):
+        """Test that the method that succeeded is tried first on the next call."""
+        self.assertTrue(NotificationManager.send_notification("Title", "First"))
+        self.assertTrue(NotificationManager.send_notification("Title", "Second"))
+
+        # AppleScript is only tried on the first call; terminal-notifier handles both
+        mock_applescript.assert_called_once()
+        self.assertEqual(mock_notifier.call_count, 2)
+
+    @patch.object(NotificationManager, '_send_native', return_value=False)
+    @patch.object(NotificationManager, 'send_notification_terminal_notifier', return_value=False)
+    @patch.object(NotificationManager, 'send_notification_applescript', return_value=True)
+    def test_send_notification_prefer_icon(self, mock_applescript, mock_notifier, mock_native):
+        """Test that terminal-notifier is tried first, with the icon, and only once."""
+        self.assertTrue(NotificationManager.send_notification(
+            "Title", "Message", icon_path=self.temp_path, prefer_icon=True
+        ))
+
+        mock_notifier.assert_called_once_with(
+            title="Title", message="Message", sound=None, icon_path=self.temp_path
+        )
+        mock_applescript.assert_called_once()
+        mock_native.assert_not_called()
+
+    @patch.object(NotificationManager, 'send_notification_terminal_notifier')
+    @patch.object(NotificationManager, 'send_notification_applescript')
+    def test_send_notification_not_macos(self, mock_applescript, mock_notifier):
+        """Test that no notification method is attempted off macOS."""
+        with patch.object(notification_manager, 'IS_MACOS', False):
+            self.assertFalse(NotificationManager.send_notification("Title", "Message"))
+
+        mock_applescript.assert_not_called()
+        mock_notifier.assert_not_called()
+
+    @patch.object(NotificationManager, 'send_notification_applescript', return_value=True)
+    def test_send_test_notification_once(self, mock_applescript):
+        """Test that a delivered test notification is not sent again."""
+        self.assertTrue(NotificationManager.send_test_notification())
+        self.assertTrue(NotificationManager.send_test_notification())
+
+        mock_applescript.assert_called_once()
+        self.assertTrue(os.path.exists(self.marker_path))
+
+    @patch.object(notification_manager, 'get_native_sender')
+    @patch.object(NotificationManager, 'send_notification_terminal_notifier', return_value=False)
+    @patch.object(NotificationManager, 'send_notification_applescript', return_value=False)
+    def test_send_test_notification_native_not_recorded(self, mock_applescript, mock_notifier,
+                                                        mock_get_sender):
+        """Test that a test notification sent only by the native sender isn't recorded."""
+        mock_get_sender.return_value.return_value = True
+
+        self.assertTrue(NotificationManager.send_test_notification())
+
+        mock_get_sender.return_value.assert_called_once()
+        self.assertFalse(os.path.exists(self.marker_path))
 
     @patch('notifications.core.notification_manager.NotificationManager.send_notification')
-    def test_send_notification_with_pync(self, mock_send):
-        """Test sending a notification with pync as fallback."""
-        # Mock imports to simulate PyObjC not available but pync available
-        with patch.dict('sys.modules', {
-            'Foundation': None,
-            'pync': MagicMock()
-        }):
-            # Configure mock to indicate success
-            mock_send.return_value = True
-
-            # Call send_notification
-            result = NotificationManager.send_notification(
-                title="Test Title",
-                message="Test Message",
-                icon_path=self.temp_file.name
-            )
-
-            # Check that the function returned True
-            self.assertTrue(result)
-
-            # Check that send_notification was called with the correct arguments
-            mock_send.assert_called_once_with(
-                title="Test Title",
-                message="Test Message",
-                icon_path=self.temp_file.name
-            )
+    def test_send_test_notification_already_registered(self, mock_send):
+        """Test that an earlier process's registration skips the test notification."""
+        open(self.marker_path, 'w').close()
+
+        self.assertTrue(NotificationManager.send_test_notification())
+
+        mock_send.assert_not_called()
 
 if __name__ == '__main__':
     unittest.main()
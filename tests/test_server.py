@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+
+import os
+import unittest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from fastmcp import Client
+
+from notifications import server
+from notifications.core.sound_manager import SoundManager
+from notifications.server import NotificationServer
+from notifications.utils.config import (
+    ENV_DEBOUNCE_MS,
+    ENV_SOUND_NOTIFICATIONS,
+    ENV_USE_HELPER_SCRIPT,
+    ENV_VISUAL_NOTIFICATIONS,
+    reload_config,
+)
+
+
+class TestTaskStatus(unittest.IsolatedAsyncioTestCase):
+    """Tests for the task_status tool, called through an in-memory MCP client."""
+
+    def setUp(self):
+        # Start every test with a long debounce window and fresh cached settings
+        env_patcher = patch.dict(os.environ, {ENV_DEBOUNCE_MS: "60000"})
+        env_patcher.start()
+        self.addCleanup(env_patcher.stop)
+        reload_config()
+        self.addCleanup(reload_config)
+
+        self.mock_visual = self._patch(server, 'send_visual_notification', return_value=False)
+        self.mock_play = self._patch(SoundManager, 'play_sound', return_value=True)
+        self._patch(SoundManager, 'get_notification_sound', return_value="/tmp/Hero.aiff")
+
+        self.server = NotificationServer()
+        self.server.sounds_verified = True
+
+    def _patch(self, target, attribute, **kwargs):
+        patcher = patch.object(target, attribute, **kwargs)
+        self.addCleanup(patcher.stop)
+        return patcher.start()
+
+    async def _call(self, *messages):
+        async with Client(self.server.mcp) as client:
+            return [
+                (await client.call_tool("task_status", {"message": message})).data
+                for message in messages
+            ]
+
+    async def test_repeat_is_coalesced(self):
+        """Test that a repeat within the window returns the first call's result."""
+        first, repeat = await self._call("Task completed", "All done")
+
+        self.assertEqual(first, {"status": "success", "message": "Task completed",
+                                 "sound": "/tmp/Hero.aiff", "visual": False})
+        self.assertEqual(repeat, dict(first, message="All done"))
+        self.mock_play.assert_called_once()
+        self.mock_visual.assert_called_once()
+
+    async def test_repeat_of_failed_call_is_coalesced(self):
+        """Test that a coalesced repeat of a failed notification also reports the error."""
+        self.mock_play.return_value = False
+
+        first, repeat = await self._call("Started processing", "Started processing")
+
+        self.assertEqual(first["status"], "error")
+        self.assertEqual(repeat, first)
+        self.mock_play.assert_called_once()
+
+    async def test_other_type_is_not_coalesced(self):
+        """Test that start and completion notifications are debounced separately."""
+        await self._call("Started processing", "Task completed")
+
+        self.assertEqual(self.mock_play.call_count, 2)
+        self.assertEqual(self.mock_visual.call_count, 2)
+
+    async def test_repeat_after_window_is_sent(self):
+        """Test that repeats are sent again when debouncing is turned off."""
+        with patch.dict(os.environ, {ENV_DEBOUNCE_MS: "0"}):
+            reload_config()
+            await self._call("Task completed", "Task completed")
+
+        self.assertEqual(self.mock_play.call_count, 2)
+
+    async def test_notifications_disabled(self):
+        """Test that nothing is sent when sound and visual notifications are both off."""
+        with patch.dict(os.environ, {ENV_SOUND_NOTIFICATIONS: "false",
+                                     ENV_VISUAL_NOTIFICATIONS: "false"}):
+            reload_config()
+            (response,) = await self._call("Task completed")
+
+        self.assertEqual(response, {"status": "success", "message": "Task completed",
+                                    "sound": None, "visual": False})
+        self.mock_play.assert_not_called()
+        self.mock_visual.assert_not_called()
+
+    async def test_sound_disabled(self):
+        """Test that only the visual notification is sent when sounds are off."""
+        self.mock_visual.return_value = True
+
+        with patch.dict(os.environ, {ENV_SOUND_NOTIFICATIONS: "false"}):
+            reload_config()
+            (response,) = await self._call("Task completed")
+
+        self.assertEqual(response, {"status": "success", "message": "Task completed",
+                                    "sound": None, "visual": True})
+        self.mock_play.assert_not_called()
+        self.mock_visual.assert_called_once_with("Claude Response Ready", "Task completed")
+
+    async def test_helper_script_off_by_default(self):
+        """Test that the helper script is not run unless it is enabled."""
+        self._patch(server, 'is_helper_script_ready', return_value=True)
+        mock_helper = self._patch(server, 'run_helper_script', new_callable=AsyncMock)
+
+        with patch.dict(os.environ, {}, clear=True):
+            reload_config()
+            await self._call("Task completed")
+
+        mock_helper.assert_not_called()
+        self.mock_play.assert_called_once()
+
+    async def test_helper_script_enabled(self):
+        """Test that the helper script replaces the built-in notifications when enabled."""
+        self._patch(server, 'is_helper_script_ready', return_value=True)
+        helper_response = {"status": "success", "message": "Task completed",
+                           "sound": None, "visual": True}
+        mock_helper = self._patch(server, 'run_helper_script', new_callable=AsyncMock,
+                                  return_value=helper_response)
+
+        with patch.dict(os.environ, {ENV_USE_HELPER_SCRIPT: "true"}):
+            reload_config()
+            (response,) = await self._call("Task completed")
+
+        mock_helper.assert_awaited_once_with(
+            server.HELPER_SCRIPT_PATH, "Claude Response Ready", "Task completed", "complete"
+        )
+        self.assertEqual(response, helper_response)
+        self.mock_play.assert_not_called()
+        self.mock_visual.assert_not_called()
+
+class TestRunHelperScript(unittest.IsolatedAsyncioTestCase):
+    """Tests for parsing the helper script's output, with the subprocess stubbed out."""
+
+    async def _run(self, stdout):
+        process = MagicMock(returncode=0)
+        process.communicate = AsyncMock(return_value=(stdout, b""))
+        with patch.object(server, 'is_helper_script_ready', return_value=True), \
+                patch('asyncio.create_subprocess_exec', AsyncMock(return_value=process)):
+            return await server.run_helper_script(
+                "/tmp/notify-claude.sh", "Title", "Message", "complete"
+            )
+
+    async def test_object_output_is_returned(self):
+        """Test that a JSON object from the script is returned as the result."""
+        result = await self._run(b'{"status": "success", "visual": true}')
+        self.assertEqual(result, {"status": "success", "visual": True})
+
+    async def test_non_object_output_is_ignored(self):
+        """Test that JSON other than an object falls back to the built-in methods."""
+        for stdout in (b'[1, 2]', b'"done"', b'42', b'not json'):
+            with self.subTest(stdout=stdout):
+                self.assertIsNone(await self._run(stdout))
+
+if __name__ == '__main__':
+    unittest.main()
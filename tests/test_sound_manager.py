@@ -1,90 +1,226 @@
 #!/usr/bin/env python3
 
 import os
-import subprocess
-import sys
 import tempfile
 import unittest
 from unittest.mock import MagicMock, patch
 
-# Add the parent directory to the path to import the notification modules
-sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
-
 # Import from the new modular structure
+from notifications.core import sound_manager
 from notifications.core.sound_manager import SoundManager
+from notifications.platform.macos import sound
 
 
 class TestSoundManager(unittest.TestCase):
     """Tests for the SoundManager class."""
 
-    def setUp(self):
-        # Create a temporary sound file for testing
-        self.temp_file = tempfile.NamedTemporaryFile(suffix='.aiff', delete=False)
-        self.temp_file.close()
+    @classmethod
+    def setUpClass(cls):
+        # Create one temporary sound file for the whole class (tests only read it)
+        fd, cls.temp_path = tempfile.mkstemp(suffix='.aiff')
+        os.close(fd)
 
-    def tearDown(self):
+    @classmethod
+    def tearDownClass(cls):
         # Remove the temporary file
-        os.unlink(self.temp_file.name)
+        os.unlink(cls.temp_path)
+
+    def setUp(self):
+        # Start every test with a fresh sound-path cache
+        SoundManager.clear_cache()
+
+        # Behave as if afplay was found at import, regardless of the host platform
+        afplay_patcher = patch.object(sound, 'AFPLAY_PATH', sound.DEFAULT_AFPLAY_PATH)
+        afplay_patcher.start()
+        self.addCleanup(afplay_patcher.stop)
+        platform_patcher = patch.object(sound_manager, 'IS_MACOS', True)
+        platform_patcher.start()
+        self.addCleanup(platform_patcher.stop)
+
+    def test_get_notification_sound_resolution(self):
+        """Test that sound paths come from the environment, falling back to the defaults."""
+        cases = [
+            # (environment, expected start sound, expected completion sound)
+            ({}, SoundManager.DEFAULT_START_PATH, SoundManager.DEFAULT_COMPLETE_PATH),
+            ({
+                SoundManager.ENV_START_SOUND: self.temp_path,
+                SoundManager.ENV_COMPLETE_SOUND: self.temp_path
+            }, self.temp_path, self.temp_path),
+        ]
+        for env, expected_start, expected_complete in cases:
+            with self.subTest(env=env):
+                SoundManager.clear_cache()
+                with patch.dict(os.environ, env, clear=True):
+                    start_sound = SoundManager.get_notification_sound(is_start=True)
+                    complete_sound = SoundManager.get_notification_sound(is_start=False)
+
+                self.assertEqual(start_sound, expected_start)
+                self.assertEqual(complete_sound, expected_complete)
+
+    @patch('os.path.exists')
+    def test_get_notification_sound_verified(self, mock_exists):
+        """Test that the resolved path is stat'd once and reported with its existence."""
+        mock_exists.return_value = False
 
-    def test_get_notification_sound_default(self):
-        """Test that default sounds are returned when no environment variables are set."""
-        # Clear any existing environment variables
         with patch.dict(os.environ, {}, clear=True):
-            start_sound = SoundManager.get_notification_sound(is_start=True)
-            complete_sound = SoundManager.get_notification_sound(is_start=False)
+            for _ in range(2):
+                start_sound, exists = SoundManager.get_notification_sound_verified(is_start=True)
+                self.assertEqual(start_sound, SoundManager.DEFAULT_START_PATH)
+                self.assertFalse(exists)
 
-            # Check that default paths are returned
-            self.assertTrue(start_sound.endswith(SoundManager.DEFAULT_START_SOUND))
-            self.assertTrue(complete_sound.endswith(SoundManager.DEFAULT_COMPLETE_SOUND))
-
-    def test_get_notification_sound_custom(self):
-        """Test that custom sound paths are used when environment variables are set."""
-        # Set custom sound paths in environment variables
-        with patch.dict(os.environ, {
-            SoundManager.ENV_START_SOUND: self.temp_file.name,
-            SoundManager.ENV_COMPLETE_SOUND: self.temp_file.name
-        }):
+        mock_exists.assert_called_once_with(SoundManager.DEFAULT_START_PATH)
+
+    def test_are_sound_notifications_enabled(self):
+        """Test that sounds are enabled by default and can be disabled."""
+        with patch.dict(os.environ, {}, clear=True):
+            self.assertTrue(SoundManager.are_sound_notifications_enabled())
+
+        SoundManager.clear_cache()
+        with patch.dict(os.environ, {SoundManager.ENV_SOUND_NOTIFICATIONS: "false"}):
+            self.assertFalse(SoundManager.are_sound_notifications_enabled())
+
+    def test_get_notification_sound_cached(self):
+        """Test that resolved sound paths are reused until the cache is cleared."""
+        with patch.dict(os.environ, {SoundManager.ENV_START_SOUND: self.temp_path}):
             start_sound = SoundManager.get_notification_sound(is_start=True)
-            complete_sound = SoundManager.get_notification_sound(is_start=False)
+            self.assertEqual(start_sound, self.temp_path)
 
-            # Check that custom paths are returned
-            self.assertEqual(start_sound, self.temp_file.name)
-            self.assertEqual(complete_sound, self.temp_file.name)
+        # The environment change is not picked up until the cache is cleared
+        with patch.dict(os.environ, {}, clear=True):
+            start_sound = SoundManager.get_notification_sound(is_start=True)
+            self.assertEqual(start_sound, self.temp_path)
+            SoundManager.clear_cache()
+            start_sound = SoundManager.get_notification_sound(is_start=True)
+            self.assertTrue(start_sound.endswith(SoundManager.DEFAULT_START_SOUND))
 
-    @patch('subprocess.run')
-    def test_play_sound_success(self, mock_run):
+    @patch('subprocess.Popen')
+    @patch('notifications.core.sound_manager.play_sound_nssound', return_value=False)
+    @patch('notifications.core.sound_manager.play_sound_audiotoolbox', return_value=False)
+    def test_play_sound_success(self, mock_audiotoolbox, mock_nssound, mock_popen):
         """Test successful sound playback."""
         # Configure mock to indicate success
         mock_process = MagicMock()
+        mock_process.communicate.return_value = (None, None)
         mock_process.returncode = 0
-        mock_run.return_value = mock_process
+        mock_popen.return_value = mock_process
 
         # Call play_sound with temporary file
-        result = SoundManager.play_sound(self.temp_file.name)
+        result = SoundManager.play_sound(self.temp_path)
+
+        # Check that afplay was spawned once and play_sound returned True
+        mock_popen.assert_called_once()
+        self.assertTrue(result)
+
+    @patch('notifications.core.sound_manager.load_sound_nssound', return_value=True)
+    @patch('notifications.core.sound_manager.load_sound_audiotoolbox', return_value=False)
+    def test_preload_sound(self, mock_audiotoolbox, mock_nssound):
+        """Test that preloading falls back to NSSound when AudioToolbox is unavailable."""
+        self.assertTrue(SoundManager.preload_sound(self.temp_path))
+        mock_audiotoolbox.assert_called_once_with(self.temp_path)
+        mock_nssound.assert_called_once_with(self.temp_path)
+
+    @patch('subprocess.Popen')
+    @patch('notifications.core.sound_manager.play_sound_nssound')
+    @patch('notifications.core.sound_manager.play_sound_audiotoolbox')
+    def test_play_sound_prefers_audiotoolbox(self, mock_audiotoolbox, mock_nssound, mock_popen):
+        """Test that AudioToolbox playback is tried before NSSound and afplay."""
+        mock_audiotoolbox.return_value = True
+
+        result = SoundManager.play_sound(self.temp_path)
 
-        # Check that subprocess.run was called correctly and returned True
-        mock_run.assert_called_once()
         self.assertTrue(result)
+        mock_audiotoolbox.assert_called_once_with(self.temp_path)
+        mock_nssound.assert_not_called()
+        mock_popen.assert_not_called()
 
-    @patch('subprocess.run')
-    def test_play_sound_failure(self, mock_run):
+    @patch('subprocess.Popen')
+    @patch('notifications.core.sound_manager.play_sound_nssound')
+    @patch('notifications.core.sound_manager.play_sound_audiotoolbox')
+    def test_play_sound_prefers_nssound(self, mock_audiotoolbox, mock_nssound, mock_popen):
+        """Test that afplay is not spawned when NSSound playback succeeds."""
+        mock_audiotoolbox.return_value = False
+        mock_nssound.return_value = True
+
+        result = SoundManager.play_sound(self.temp_path)
+
+        self.assertTrue(result)
+        mock_nssound.assert_called_once_with(self.temp_path)
+        mock_popen.assert_not_called()
+
+    @patch('subprocess.Popen')
+    @patch('notifications.core.sound_manager.play_sound_nssound', return_value=False)
+    @patch('notifications.core.sound_manager.play_sound_audiotoolbox', return_value=False)
+    def test_play_sound_restarts_running_afplay(self, mock_audiotoolbox, mock_nssound,
+                                                mock_popen):
+        """Test that replaying a sound stops its still-running afplay process."""
+        first, second = MagicMock(), MagicMock()
+        for process in (first, second):
+            process.communicate.return_value = (None, None)
+            process.returncode = 0
+        first.poll.return_value = None
+        mock_popen.side_effect = [first, second]
+
+        self.assertTrue(SoundManager.play_sound(self.temp_path))
+        self.assertTrue(SoundManager.play_sound(self.temp_path))
+
+        first.terminate.assert_called_once()
+        second.terminate.assert_not_called()
+
+    @patch('subprocess.Popen')
+    @patch('notifications.core.sound_manager.play_sound_nssound', return_value=False)
+    @patch('notifications.core.sound_manager.play_sound_audiotoolbox', return_value=False)
+    def test_play_sound_failure(self, mock_audiotoolbox, mock_nssound, mock_popen):
         """Test handling of playback failures."""
-        # Configure mock to raise CalledProcessError
-        mock_run.side_effect = subprocess.CalledProcessError(1, ['afplay'], stderr=b'Error')
+        # Configure mock to fail spawning afplay
+        mock_popen.side_effect = FileNotFoundError(2, 'No such file or directory', 'afplay')
 
         # Call play_sound with temporary file
-        result = SoundManager.play_sound(self.temp_file.name)
+        result = SoundManager.play_sound(self.temp_path)
 
         # Check that function handled the error and returned False
         self.assertFalse(result)
 
-    def test_play_sound_missing_file(self):
-        """Test handling of missing sound files."""
+    @patch('subprocess.Popen')
+    @patch('notifications.core.sound_manager.play_sound_nssound', return_value=False)
+    @patch('notifications.core.sound_manager.play_sound_audiotoolbox', return_value=False)
+    def test_play_sound_afplay_unavailable(self, mock_audiotoolbox, mock_nssound, mock_popen):
+        """Test that a missing afplay fails fast without attempting a spawn."""
+        with patch.object(sound, 'AFPLAY_PATH', None):
+            result = SoundManager.play_sound(self.temp_path)
+
+        mock_popen.assert_not_called()
+        self.assertFalse(result)
+
+    @patch('subprocess.Popen')
+    @patch('notifications.core.sound_manager.play_sound_nssound')
+    @patch('notifications.core.sound_manager.play_sound_audiotoolbox')
+    def test_play_sound_not_macos(self, mock_audiotoolbox, mock_nssound, mock_popen):
+        """Test that no backend is attempted off macOS."""
+        with patch.object(sound_manager, 'IS_MACOS', False):
+            result = SoundManager.play_sound(self.temp_path)
+
+        mock_audiotoolbox.assert_not_called()
+        mock_nssound.assert_not_called()
+        mock_popen.assert_not_called()
+        self.assertFalse(result)
+
+    @patch('os.path.exists')
+    @patch('subprocess.Popen')
+    @patch('notifications.core.sound_manager.play_sound_nssound', return_value=False)
+    @patch('notifications.core.sound_manager.play_sound_audiotoolbox', return_value=False)
+    def test_play_sound_missing_file(self, mock_audiotoolbox, mock_nssound, mock_popen,
+                                     mock_exists):
+        """Test that play_sound leaves missing-file detection to afplay."""
+        mock_popen.return_value.communicate.return_value = (None, None)
+        mock_popen.return_value.returncode = 1
+
         # Call play_sound with non-existent file
         result = SoundManager.play_sound("/non/existent/file.aiff")
 
-        # Check that function detected missing file and returned False
-        self.assertFalse(result)
+        # The file is not stat'd per call; afplay is spawned and reports the error itself
+        mock_exists.assert_not_called()
+        self.assertEqual(mock_popen.call_args[0][0][-1], "/non/existent/file.aiff")
+        self.assertTrue(result)
 
 if __name__ == '__main__':
     unittest.main()